@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+import hashlib
+import uuid
+import os
+
+from cache import TTLCache
+from models import User
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached copy of the user fields request handlers need"""
+    id: uuid.UUID
+    email: str
+    display_name: str
+    handle: str
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            display_name=user.display_name,
+            handle=user.handle,
+            created_at=user.created_at
+        )
+
+def hash_token(token: str) -> bytes:
+    """What the sessions table stores for a session cookie"""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+# Session token hash -> UserSnapshot. A revoked session can outlive logout on other
+# workers for at most SESSION_CACHE_TTL seconds.
+session_cache = TTLCache(
+    maxsize=int(os.getenv("SESSION_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("SESSION_CACHE_TTL", "60"))
+)
+
+# Comma-separated emails of the accounts allowed to use admin-only endpoints
+ADMIN_EMAILS = frozenset(
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+)
+
+def is_admin(user: UserSnapshot) -> bool:
+    return user.email.lower() in ADMIN_EMAILS
+
+def seconds_until(moment: datetime) -> float:
+    """Seconds from now until a (naive UTC or aware) timestamp"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - datetime.utcnow()).total_seconds()
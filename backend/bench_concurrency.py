@@ -0,0 +1,72 @@
+"""Throughput benchmark for a running API under many concurrent clients.
+
+Start the server (e.g. `uvicorn main:app --port 8000`) and run:
+
+    python bench_concurrency.py --url http://localhost:8000/posts --clients 200 --requests 5000
+
+Run it once against the old build and once against the new one with the same
+database to compare requests/second and latency percentiles.
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+def run(url: str, clients: int, total: int, timeout: float):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = [total]
+
+    def client():
+        nonlocal errors
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    response.read()
+                ok = True
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    print(f"url:          {url}")
+    print(f"clients:      {clients}")
+    print(f"requests:     {len(latencies)} ok, {errors} failed")
+    print(f"wall time:    {wall:.2f} s")
+    print(f"throughput:   {len(latencies) / wall:.1f} req/s")
+    if latencies:
+        print(f"latency mean: {statistics.mean(latencies) * 1000:.1f} ms")
+        print(f"latency p50:  {pct(0.50):.1f} ms")
+        print(f"latency p95:  {pct(0.95):.1f} ms")
+        print(f"latency p99:  {pct(0.99):.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent client benchmark")
+    parser.add_argument("--url", default="http://localhost:8000/posts")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    run(args.url, args.clients, args.requests, args.timeout)
@@ -0,0 +1,75 @@
+"""Benchmark for the FAST_JSON serializer.
+
+    python bench_json.py
+
+Builds pages of in-memory posts and times serializing them the way FastAPI
+does for a response_model (pydantic models, re-validation, then
+JSONResponse) against fast_json, at limit=20 and limit=100. That both give
+the same bytes is checked by tests/test_fast_json.py.
+"""
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import random
+import sys
+import timeit
+import uuid
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import fast_json
+from feed import post_response
+from models import Post, User
+from schemas import PostList
+
+if fast_json.orjson is None:
+    sys.exit("orjson is not installed")
+
+POST_LIST_FIELD = create_response_field(name="response", type_=PostList)
+
+loop = asyncio.new_event_loop()
+
+def make_posts(count: int, rng: random.Random, aware: bool):
+    tz = timezone.utc if aware else None
+    start = datetime(2026, 10, 16, 12, 0, 0, tzinfo=tz)
+    authors = [
+        User(id=uuid.uuid4(), display_name=name, handle=name.lower()[:8] + str(i))
+        for i, name in enumerate(["Ann", "Zoë", "Kenji", "Ola \"O\" Smith"])
+    ]
+    posts = []
+    for i in range(count):
+        author = rng.choice(authors)
+        posts.append(Post(
+            id=uuid.uuid4(), author=author, author_id=author.id,
+            body=rng.choice(["Grateful for sunshine ☀", "Small win today!", "Tea & \"quiet\" mornings", "Danke 💛"]),
+            parent_id=None, is_deleted=False,
+            like_count=rng.randint(0, 500), reply_count=rng.randint(0, 40),
+            created_at=start - timedelta(seconds=i * 7, microseconds=rng.choice([0, 120000, 7])),
+        ))
+    return posts
+
+def pydantic_bytes(field, content) -> bytes:
+    """What FastAPI sends for a handler returning a model under response_model"""
+    jsonable = loop.run_until_complete(serialize_response(field=field, response_content=content))
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def per_page_ms(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    for limit in (20, 100):
+        posts = make_posts(limit, rng, aware=True)
+        liked = {post.id for post in posts[::4]}
+
+        def pydantic_path():
+            page = PostList(items=[post_response(post, liked) for post in posts], next_cursor="c_1")
+            pydantic_bytes(POST_LIST_FIELD, page)
+
+        def fast_path():
+            fast_json.post_list_json(posts, liked, "c_1")
+
+        slow = per_page_ms(pydantic_path, 200)
+        fast = per_page_ms(fast_path, 200)
+        print(f"feed page limit={limit}: pydantic {slow:.3f} ms, fast_json {fast:.3f} ms ({slow / fast:.1f}x)")
@@ -0,0 +1,68 @@
+"""Per-call cost of check_positivity against the old substring loop.
+
+    python bench_positivity.py
+
+Measures 140-character posts with the built-in word list and with a
+synthetic 10,000-word lexicon.
+"""
+import random
+import re
+import string
+import timeit
+
+import positivity
+
+LEGACY_PATTERNS = [
+    r"\b(not|never|can't|won't|don't|couldn't|shouldn't)\b.*\b(good|great|amazing|awesome)\b",
+    r"\b(everything|nothing).*\b(wrong|bad|terrible)\b"
+]
+
+def legacy_check(text: str, words) -> bool:
+    """The original implementation: one substring scan per word plus two re.search calls"""
+    text_lower = text.lower()
+    for word in words:
+        if word in text_lower:
+            return False
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, text_lower):
+            return False
+    return True
+
+def make_posts(count: int, rng: random.Random):
+    vocabulary = ["grateful", "sunshine", "coffee", "friends", "walk", "today", "small", "win",
+                  "learned", "something", "new", "family", "dinner", "garden", "music", "thanks"]
+    posts = []
+    for _ in range(count):
+        words = []
+        while len(" ".join(words)) < 140:
+            words.append(rng.choice(vocabulary))
+        posts.append(" ".join(words)[:140])
+    return posts
+
+def synthetic_lexicon(size: int, rng: random.Random):
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10))) for _ in range(size)]
+
+def per_call_us(fn, posts, number: int) -> float:
+    def run():
+        for post in posts:
+            fn(post)
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    return seconds / (number * len(posts)) * 1e6
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    posts = make_posts(200, rng)
+
+    for label, words, number in (
+        ("built-in list", positivity.NEGATIVE_WORDS, 50),
+        ("10k-word lexicon", synthetic_lexicon(10_000, rng), 2),
+    ):
+        positivity.reload_lexicon(words)
+        # The old loop had no stems, a stem was just a substring
+        substrings = [word.rstrip("*") for word in words]
+        legacy = per_call_us(lambda text: legacy_check(text, substrings), posts, number)
+        compiled = per_call_us(positivity.check_positivity, posts, number)
+        print(f"{label:18} ({len(words):>6} words, 140 chars): "
+              f"legacy {legacy:9.2f} us/call, compiled {compiled:6.2f} us/call, {legacy / compiled:6.1f}x")
+
+    positivity.reload_lexicon()
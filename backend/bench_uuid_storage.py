@@ -0,0 +1,154 @@
+"""Compare text and binary UUID storage on SQLite.
+
+    python bench_uuid_storage.py [--users 1000] [--posts 20000] [--likes 100000]
+
+Builds a database with the current schema and random data, copies it and
+converts the copy with convert_uuids.py. It then prints the file size and
+the size of every table and index, and times the feed page, the viewer's
+liked lookup and a replies page on both copies.
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_uuid_")
+TEXT_DB = os.path.join(WORKDIR, "text.db")
+BINARY_DB = os.path.join(WORKDIR, "binary.db")
+
+# Fresh database for the schema; every query is actually run each time
+os.environ["DATABASE_URL"] = f"sqlite:///{TEXT_DB}"
+os.environ["LIKED_FILTER_TTL"] = "0"
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from convert_uuids import convert
+from database import engine, init_db
+from feed import feed_page_stmt, replies_page_stmt, load_liked_post_ids
+from models import Post, UUID
+
+def populate(path: str, users: int, posts: int, likes: int, rng: random.Random) -> uuid.UUID:
+    """Random users, posts (a fifth of them replies) and likes, returns the busiest post"""
+    connection = sqlite3.connect(path)
+    start = datetime(2026, 1, 1)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    connection.executemany(
+        "INSERT INTO users (id, email, password_hash, display_name, handle, email_verified, created_at) "
+        "VALUES (?, ?, 'x', 'User', ?, 1, ?)",
+        [(user_id, f"u{i}@example.com", f"user{i}", str(start)) for i, user_id in enumerate(user_ids)]
+    )
+
+    post_rows, top_level = [], []
+    for i in range(posts):
+        post_id = str(uuid.uuid4())
+        parent_id = rng.choice(top_level) if top_level and rng.random() < 0.2 else None
+        if parent_id is None:
+            top_level.append(post_id)
+        created_at = (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S.%f")
+        post_rows.append((post_id, rng.choice(user_ids), "Grateful for today", parent_id, created_at))
+    connection.executemany(
+        "INSERT INTO posts (id, author_id, body, parent_id, is_deleted, like_count, reply_count, created_at) "
+        "VALUES (?, ?, ?, ?, 0, 0, 0, ?)",
+        post_rows
+    )
+
+    pairs = set()
+    post_ids = [row[0] for row in post_rows]
+    while len(pairs) < likes:
+        pairs.add((rng.choice(post_ids[-2000:]) if rng.random() < 0.5 else rng.choice(post_ids), rng.choice(user_ids)))
+    connection.executemany("INSERT INTO likes (post_id, user_id) VALUES (?, ?)", list(pairs))
+    connection.commit()
+
+    busiest = connection.execute(
+        "SELECT parent_id FROM posts WHERE parent_id IS NOT NULL GROUP BY parent_id ORDER BY count(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    connection.execute("VACUUM")
+    connection.close()
+    return uuid.UUID(busiest)
+
+def sizes(path: str) -> dict:
+    connection = sqlite3.connect(path)
+    rows = connection.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name").fetchall()
+    connection.close()
+    return dict(rows)
+
+async def time_queries(path: str, binary: bool, viewer_id: uuid.UUID, thread_id: uuid.UUID, runs: int) -> dict:
+    UUID.binary_sqlite = binary
+    bench_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session = async_sessionmaker(bench_engine, expire_on_commit=False)
+    timings = {"feed page": [], "liked lookup": [], "replies page": []}
+
+    async with session() as db:
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = await db.execute(feed_page_stmt(None, 20, Post).options(selectinload(Post.author)))
+            posts = result.scalars().all()
+            timings["feed page"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await load_liked_post_ids(db, [post.id for post in posts], viewer_id)
+            timings["liked lookup"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = await db.execute(replies_page_stmt(thread_id, None, 50, Post).options(selectinload(Post.author)))
+            result.scalars().all()
+            timings["replies page"].append(time.perf_counter() - start)
+            db.expunge_all()
+
+    await bench_engine.dispose()
+    return {name: statistics.median(values) * 1000 for name, values in timings.items()}
+
+def percent(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else ""
+
+async def main():
+    parser = argparse.ArgumentParser(description="Text vs binary UUID storage on SQLite")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--likes", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    await init_db()
+    await engine.dispose()
+    rng = random.Random(args.seed)
+    thread_id = populate(TEXT_DB, args.users, args.posts, args.likes, rng)
+    viewer_id = uuid.UUID(sqlite3.connect(TEXT_DB).execute("SELECT id FROM users LIMIT 1").fetchone()[0])
+
+    shutil.copyfile(TEXT_DB, BINARY_DB)
+    convert(BINARY_DB, "binary")
+
+    print(f"{args.users} users, {args.posts} posts, {args.likes} likes")
+    print(f"\n{'file':<34}{'text':>12}{'binary':>12}")
+    text_size, binary_size = os.path.getsize(TEXT_DB), os.path.getsize(BINARY_DB)
+    print(f"{'database':<34}{text_size:>12,}{binary_size:>12,}  {percent(text_size, binary_size)}")
+
+    text_sizes, binary_sizes = sizes(TEXT_DB), sizes(BINARY_DB)
+    print(f"\n{'table / index (bytes)':<34}{'text':>12}{'binary':>12}")
+    for name in sorted(text_sizes, key=text_sizes.get, reverse=True):
+        before, after = text_sizes[name], binary_sizes.get(name, 0)
+        # Skip the schema and tables that fit in a single page
+        if name == "sqlite_schema" or before <= 4096:
+            continue
+        print(f"{name:<34}{before:>12,}{after:>12,}  {percent(before, after)}")
+
+    text_times = await time_queries(TEXT_DB, False, viewer_id, thread_id, args.runs)
+    binary_times = await time_queries(BINARY_DB, True, viewer_id, thread_id, args.runs)
+    print(f"\n{'median query time (ms)':<34}{'text':>12}{'binary':>12}")
+    for name in text_times:
+        before, after = text_times[name], binary_times[name]
+        print(f"{name:<34}{before:>12.3f}{after:>12.3f}  {percent(before, after)}")
+
+    shutil.rmtree(WORKDIR)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,202 @@
+"""Small CPU-only positivity classifier.
+
+Features are hashed word unigrams/bigrams plus character trigrams, and the
+model is a logistic regression stored as a single NumPy weight vector, so a
+batch of posts is scored with one gather and one bincount.
+
+    python classifier.py train labeled.tsv --model positivity_model.npz
+    python classifier.py evaluate labeled.tsv --model positivity_model.npz
+
+Labeled files are either TSV (`label<TAB>text`) or JSON lines
+(`{"label": 1, "text": "..."}`), with 1 for positive and 0 for negative.
+"""
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+import argparse
+import json
+import random
+import re
+import time
+import zlib
+
+import numpy as np
+
+DEFAULT_FEATURES = 1 << 18
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+@lru_cache(maxsize=1 << 16)
+def _hash_feature(feature: str, n_features: int) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % n_features
+
+def extract_features(text: str, n_features: int = DEFAULT_FEATURES) -> List[int]:
+    """Hashed feature indices for one text (repeats count as repeated features)"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = [f"w:{token}" for token in tokens]
+    features.extend(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    for token in tokens:
+        padded = f"<{token}>"
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return [_hash_feature(feature, n_features) for feature in features]
+
+def vectorize(texts: Sequence[str], n_features: int = DEFAULT_FEATURES) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse batch as (feature indices, row of each index), both flat int arrays"""
+    indices: List[int] = []
+    rows: List[int] = []
+    for row, text in enumerate(texts):
+        features = extract_features(text, n_features)
+        indices.extend(features)
+        rows.extend([row] * len(features))
+    return np.asarray(indices, dtype=np.int64), np.asarray(rows, dtype=np.int64)
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+class PositivityClassifier:
+    """Logistic regression over hashed features"""
+
+    def __init__(self, weights: np.ndarray, bias: float = 0.0):
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+    def score(self, texts: Sequence[str]) -> List[float]:
+        """Probability that each text is positive"""
+        return self.predict_proba(texts).tolist()
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        indices, rows = vectorize(texts, self.n_features)
+        logits = np.bincount(rows, weights=self.weights[indices], minlength=len(texts)) + self.bias
+        return _sigmoid(logits)
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[int], n_features: int = DEFAULT_FEATURES,
+              epochs: int = 20, learning_rate: float = 0.5, l2: float = 1e-6,
+              batch_size: int = 256, seed: int = 0) -> "PositivityClassifier":
+        """Mini-batch AdaGrad, which suits sparse hashed features"""
+        rng = np.random.default_rng(seed)
+        y = np.asarray(labels, dtype=np.float64)
+        weights = np.zeros(n_features, dtype=np.float64)
+        grad_sq = np.full(n_features, 1e-8)
+        bias, bias_grad_sq = 0.0, 1e-8
+
+        # Vectorize once, then slice batches out of the flat arrays
+        per_text = [np.asarray(extract_features(text, n_features), dtype=np.int64) for text in texts]
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                indices = np.concatenate([per_text[i] for i in batch]) if len(batch) else np.zeros(0, np.int64)
+                rows = np.repeat(np.arange(len(batch)), [len(per_text[i]) for i in batch])
+
+                logits = np.bincount(rows, weights=weights[indices], minlength=len(batch)) + bias
+                error = _sigmoid(logits) - y[batch]
+
+                grad = np.bincount(indices, weights=error[rows], minlength=n_features) / len(batch)
+                touched = np.unique(indices)
+                grad[touched] += l2 * weights[touched]
+                grad_sq[touched] += grad[touched] ** 2
+                weights[touched] -= learning_rate * grad[touched] / np.sqrt(grad_sq[touched])
+
+                bias_grad = float(error.mean())
+                bias_grad_sq += bias_grad ** 2
+                bias -= learning_rate * bias_grad / np.sqrt(bias_grad_sq)
+
+        return cls(weights, bias)
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=np.float64(self.bias))
+
+    @classmethod
+    def load(cls, path: str) -> "PositivityClassifier":
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"]))
+
+def load_labeled(path: str) -> Tuple[List[str], List[int]]:
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if line.lstrip().startswith("{"):
+                record = json.loads(line)
+                label, text = record["label"], record["text"]
+            else:
+                label, text = line.split("\t", 1)
+            labels.append(1 if str(label).strip().lower() in ("1", "positive", "pos", "true") else 0)
+            texts.append(text)
+    return texts, labels
+
+def evaluate(model: PositivityClassifier, texts: Sequence[str], labels: Sequence[int], threshold: float = 0.5) -> dict:
+    start = time.perf_counter()
+    probabilities = model.predict_proba(texts)
+    elapsed = time.perf_counter() - start
+
+    predicted = probabilities >= threshold
+    actual = np.asarray(labels, dtype=bool)
+    tp = int(np.sum(predicted & actual))
+    tn = int(np.sum(~predicted & ~actual))
+    fp = int(np.sum(predicted & ~actual))
+    fn = int(np.sum(~predicted & actual))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "examples": len(texts),
+        "accuracy": round((tp + tn) / len(texts), 4) if len(texts) else 0.0,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "negatives_caught": round(tn / (tn + fp), 4) if tn + fp else 0.0,
+        "posts_per_second": round(len(texts) / elapsed) if elapsed > 0 else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or evaluate the positivity classifier")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train on a labeled file")
+    train_parser.add_argument("data")
+    train_parser.add_argument("--model", default="positivity_model.npz")
+    train_parser.add_argument("--features", type=int, default=DEFAULT_FEATURES)
+    train_parser.add_argument("--epochs", type=int, default=20)
+    train_parser.add_argument("--learning-rate", type=float, default=0.5)
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Fraction kept back for evaluation")
+    train_parser.add_argument("--seed", type=int, default=0)
+
+    eval_parser = subparsers.add_parser("evaluate", help="Evaluate a saved model on a labeled file")
+    eval_parser.add_argument("data")
+    eval_parser.add_argument("--model", default="positivity_model.npz")
+    eval_parser.add_argument("--threshold", type=float, default=0.5)
+
+    args = parser.parse_args()
+    texts, labels = load_labeled(args.data)
+
+    if args.command == "train":
+        examples = list(zip(texts, labels))
+        random.Random(args.seed).shuffle(examples)
+        split = int(len(examples) * (1 - args.holdout))
+        train_set, test_set = examples[:split], examples[split:]
+
+        start = time.perf_counter()
+        model = PositivityClassifier.train(
+            [t for t, _ in train_set], [l for _, l in train_set],
+            n_features=args.features, epochs=args.epochs,
+            learning_rate=args.learning_rate, seed=args.seed
+        )
+        print(f"Trained on {len(train_set)} examples in {time.perf_counter() - start:.1f}s")
+        model.save(args.model)
+        print(f"Saved model to {args.model}")
+        if test_set:
+            print(json.dumps(evaluate(model, [t for t, _ in test_set], [l for _, l in test_set]), indent=2))
+    else:
+        model = PositivityClassifier.load(args.model)
+        print(json.dumps(evaluate(model, texts, labels, args.threshold), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""HTTP validators for the read endpoints.
+
+ETags are weak and derived from the state a response is built from (ids,
+timestamps, counters and the viewer's likes), so a handler can check
+If-None-Match against a few narrow queries before building any response
+objects. Last-Modified is the newest creation time in the payload; likes and
+deletes do not move it, so If-Modified-Since alone never produces a 304.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+import hashlib
+
+from fastapi import Response
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+def http_date(moment: datetime) -> str:
+    # SQLite hands back naive datetimes, which are UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, private: bool = False) -> dict:
+    """Validators plus Cache-Control; responses with user_liked are private"""
+    headers = {
+        "ETag": etag,
+        # Caches may keep a copy but must revalidate it, which is cheap
+        "Cache-Control": "private, no-cache" if private else "public, no-cache",
+        "Vary": "Cookie",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,75 @@
+"""Convert the UUID columns of a SQLite database between text and binary storage.
+
+    python convert_uuids.py --to binary    # then run the app with SQLITE_BINARY_UUIDS=1
+    python convert_uuids.py --to text      # back again, then unset it
+
+Rewrites every column declared with models.UUID in one transaction, then
+VACUUMs so the freed pages are given back. Values already in the target
+format are skipped, so an interrupted run can simply be repeated. Stop the
+app first: it refuses to start while SQLITE_BINARY_UUIDS and the stored
+format disagree.
+"""
+from typing import Dict, List, Tuple
+import argparse
+import sqlite3
+import sys
+import uuid
+
+from database import DATABASE_URL, IS_SQLITE
+from models import Base, UUID
+
+def uuid_columns() -> List[Tuple[str, str]]:
+    return [
+        (table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, UUID)
+    ]
+
+def _to_binary(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+def _to_text(value):
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+def convert(path: str, target: str) -> Dict[str, int]:
+    """Convert the database file at path to "binary" or "text" ids, returns the values changed per column"""
+    source_type = "text" if target == "binary" else "blob"
+    connection = sqlite3.connect(path)
+    connection.create_function(
+        "convert_uuid", 1, _to_binary if target == "binary" else _to_text, deterministic=True
+    )
+
+    counts = {}
+    with connection:
+        for table, column in uuid_columns():
+            cursor = connection.execute(
+                f'UPDATE "{table}" SET "{column}" = convert_uuid("{column}") WHERE typeof("{column}") = ?',
+                (source_type,)
+            )
+            counts[f"{table}.{column}"] = cursor.rowcount
+    connection.execute("VACUUM")
+    connection.close()
+    return counts
+
+def sqlite_path(url: str) -> str:
+    # sqlite+aiosqlite:///./file.db -> ./file.db
+    return url.split(":///", 1)[1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert SQLite UUID storage between text and binary")
+    parser.add_argument("--to", choices=["binary", "text"], required=True)
+    parser.add_argument("--database", help="SQLite file, defaults to the one in DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.database is None and not IS_SQLITE:
+        sys.exit("Only SQLite databases store UUIDs as text; Postgres has a native uuid type")
+    path = args.database or sqlite_path(DATABASE_URL)
+    if path in ("", ":memory:"):
+        sys.exit("Needs a database file")
+
+    for column, changed in convert(path, args.to).items():
+        print(f"{column}: {changed} value(s) converted")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy import select, update, func, and_, or_
+from typing import Optional, Set
+import asyncio
+import json
+import uuid
+import os
+
+from database import async_session
+from events import Event, EventHub, event_hub, encode_event, post_topic
+from models import Post, Like
+
+async def adjust_like_count(db: AsyncSession, post_id: uuid.UUID, delta: int):
+    """Shift a post's like counter inside the caller's transaction"""
+    await db.execute(
+        update(Post).where(Post.id == post_id).values(like_count=Post.like_count + delta)
+    )
+
+async def adjust_reply_count(db: AsyncSession, post_id: uuid.UUID, delta: int):
+    """Shift a post's reply counter inside the caller's transaction"""
+    await db.execute(
+        update(Post).where(Post.id == post_id).values(reply_count=Post.reply_count + delta)
+    )
+
+async def reconcile_counters(db: AsyncSession) -> int:
+    """Recompute like/reply counters from the source tables, returns the number of posts repaired"""
+    reply = aliased(Post)
+    actual_likes = select(func.count(Like.post_id)).where(
+        Like.post_id == Post.id
+    ).scalar_subquery()
+    actual_replies = select(func.count(reply.id)).where(
+        and_(reply.parent_id == Post.id, reply.is_deleted == False)
+    ).scalar_subquery()
+
+    stmt = update(Post).where(
+        or_(Post.like_count != actual_likes, Post.reply_count != actual_replies)
+    ).values(
+        like_count=actual_likes,
+        reply_count=actual_replies
+    ).execution_options(synchronize_session=False)
+
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+def counts_event(row) -> Event:
+    return encode_event("counts", json.dumps({
+        "id": str(row.id),
+        "like_count": row.like_count,
+        "reply_count": row.reply_count,
+    }))
+
+class CounterBroadcaster:
+    """Pushes like/reply counter changes to live post streams, coalesced.
+
+    Writers only mark a post as changed. Every `window` seconds the current
+    counters of all changed posts are read in one query and each post gets
+    a single "counts" event on its own topic and on its parent's (a thread
+    page follows its replies too). A viral post therefore produces at most
+    one message per window per subscriber, however many likes it gets.
+    """
+
+    def __init__(self, hub: EventHub, window: float = 0.5):
+        self.hub = hub
+        self.window = window
+        self.pending: Set[uuid.UUID] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.touches = 0
+        self.flushes = 0
+        self.events = 0
+        self.errors = 0
+
+    def touch(self, post_id: uuid.UUID, parent_id: Optional[uuid.UUID] = None):
+        """Note that a post's counters changed; free when nobody is watching"""
+        if self.hub.has_subscribers(post_topic(post_id)) or (
+            parent_id is not None and self.hub.has_subscribers(post_topic(parent_id))
+        ):
+            self.pending.add(post_id)
+            self.touches += 1
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.errors += 1
+                print(f"Counter broadcast failed: {type(e).__name__}: {str(e)}")
+
+    async def flush(self):
+        if not self.pending:
+            return
+        post_ids, self.pending = self.pending, set()
+
+        async with async_session() as db:
+            result = await db.execute(
+                select(Post.id, Post.parent_id, Post.like_count, Post.reply_count).where(Post.id.in_(post_ids))
+            )
+            rows = result.all()
+
+        for row in rows:
+            event = counts_event(row)
+            self.events += self.hub.publish(post_topic(row.id), event)
+            if row.parent_id is not None:
+                self.events += self.hub.publish(post_topic(row.parent_id), event)
+        self.flushes += 1
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window,
+            "pending": len(self.pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "events": self.events,
+            "errors": self.errors,
+        }
+
+counter_broadcaster = CounterBroadcaster(event_hub, window=float(os.getenv("COUNTER_BROADCAST_WINDOW", "0.5")))
+
+async def main():
+    from database import async_session, init_db
+
+    # Make sure the schema (and so the counter columns) is up to date
+    await init_db()
+
+    async with async_session() as db:
+        repaired = await reconcile_counters(db)
+        print(f"Reconciled post counters: {repaired} post(s) repaired")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,35 +1,180 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import Table, select, func, literal_column, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+import threading
+import time
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./positive_journal.db")
 
-# Convert async URLs to sync
-if "postgresql+asyncpg://" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql+psycopg2://")
-elif DATABASE_URL.startswith("postgresql://") and "+psycopg2" not in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://")
+# Convert sync URLs to their async drivers
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
+elif DATABASE_URL.startswith("postgresql+psycopg2://"):
+    DATABASE_URL = DATABASE_URL.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+elif DATABASE_URL.startswith("postgresql://"):
+    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+elif DATABASE_URL.startswith("sqlite://"):
+    DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
-engine = create_engine(
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool that records how long checkouts wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+def _pool_options() -> dict:
+    # In-memory SQLite lives inside a single connection, so it has to be shared
+    if IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite+aiosqlite:"):
+        return {"poolclass": StaticPool}
+
+    # SQLite has no server side to drop idle connections, so there is no need
+    # to ping or recycle them
+    defaults = {
+        "size": 5,
+        "overflow": 10,
+        "pre_ping": False if IS_SQLITE else True,
+        "recycle": -1 if IS_SQLITE else 1800,
+        "timeout": 30,
+    }
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", defaults["size"]),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", defaults["overflow"]),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", defaults["pre_ping"]),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", defaults["recycle"]),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", defaults["timeout"]),
+    }
+
+engine = create_async_engine(
     DATABASE_URL,
-    poolclass=NullPool,
     echo=True if os.getenv("DEBUG") else False,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    **_pool_options()
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
-
-def init_db():
-    from models import Base
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+# Objects stay usable after commit, since lazy refreshes cannot run outside an await
+async_session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+def pool_metrics() -> dict:
+    """Snapshot of connection pool usage for the metrics endpoint"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    # Unbounded overflow has no ceiling to saturate
+    capacity = pool.size() + pool._max_overflow if pool._max_overflow >= 0 else 0
+    checked_out = pool.checkedout()
+    with pool._stats_lock:
+        checkouts = pool.checkouts
+        return {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity > 0 else None,
+            "checkouts": checkouts,
+            "checkout_timeouts": pool.checkout_timeouts,
+            "checkout_wait_ms_avg": round(pool.wait_seconds_total / checkouts * 1000, 3) if checkouts else 0.0,
+            "checkout_wait_ms_max": round(pool.wait_seconds_max * 1000, 3),
+        }
+
+def dialect_insert(entity):
+    """INSERT construct with ON CONFLICT support (SQLite or Postgres)"""
+    if IS_SQLITE:
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(entity)
+
+async def estimated_row_count(db: AsyncSession, table: Table) -> int:
+    """Cheap row count from planner statistics instead of a full COUNT(*).
+
+    Postgres reads pg_class.reltuples (exact count if the table was never
+    analyzed). SQLite uses max(rowid), which is exact for tables that are only
+    appended to and an upper bound otherwise.
+    """
+    if IS_SQLITE:
+        result = await db.execute(select(func.max(literal_column("rowid"))).select_from(table))
+        return result.scalar() or 0
+
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table.name}
+    )
+    estimate = result.scalar()
+    if estimate is None or estimate < 0:
+        result = await db.execute(select(func.count()).select_from(table))
+        return result.scalar()
+    return estimate
+
+async def get_db():
+    async with async_session() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+def run_migrations(connection):
+    """Upgrade the schema to the latest Alembic revision on an open connection"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+def check_uuid_storage(connection):
+    """Refuse to start when SQLITE_BINARY_UUIDS does not match how the ids are stored"""
+    from models import UUID
+
+    if not connection.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'")).first():
+        return
+    stored = connection.execute(text("SELECT typeof(id) FROM users LIMIT 1")).scalar()
+    expected = "blob" if UUID.binary_sqlite else "text"
+    if stored is not None and stored != expected:
+        raise RuntimeError(
+            f"ids in this database are stored as {stored} but SQLITE_BINARY_UUIDS expects {expected}, "
+            "convert it with convert_uuids.py"
+        )
+
+async def init_db():
+    async with engine.begin() as connection:
+        if IS_SQLITE:
+            await connection.run_sync(check_uuid_storage)
+        await connection.run_sync(run_migrations)
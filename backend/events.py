@@ -0,0 +1,151 @@
+"""In-process publish/subscribe hub for Server-Sent Events.
+
+Handlers publish to a topic ("posts" for new top-level posts, post_topic(id)
+for one post's live counters) and every
+open stream subscribed to that topic gets the event. Each event is encoded
+to SSE bytes once at publish time, so fanning it out to thousands of idle
+connections is a put_nowait per subscriber. A subscriber whose bounded queue
+fills up is disconnected rather than allowed to hold memory or slow the
+publisher; clients reconnect with Last-Event-ID and catch up from the
+database.
+
+The hub only reaches clients connected to the same worker process.
+"""
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Optional, Set
+import asyncio
+import os
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "64"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "10000"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+@dataclass(frozen=True)
+class Event:
+    """An encoded SSE message; key identifies what it is about (e.g. a post id)"""
+    data: bytes
+    key: Optional[str] = None
+
+def encode_event(event_type: str, data: str, event_id: Optional[str] = None, key: Optional[str] = None) -> Event:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return Event(("\n".join(lines) + "\n\n").encode("utf-8"), key)
+
+HEARTBEAT = b": ping\n\n"
+
+def post_topic(post_id) -> str:
+    return f"post:{post_id}"
+
+class Subscriber:
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def close(self):
+        """Stop the stream; the None sentinel wakes up its reader"""
+        if not self.closed:
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+class HubFull(Exception):
+    """Raised when the worker already serves SSE_MAX_SUBSCRIBERS streams"""
+
+class EventHub:
+    def __init__(self, queue_size: int = 64, max_subscribers: int = 10000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.topics: Dict[str, Set[Subscriber]] = {}
+        self.subscriber_count = 0
+        self.published = 0
+        self.delivered = 0
+        self.slow_disconnects = 0
+
+    def subscribe(self, topic: str) -> Subscriber:
+        if self.subscriber_count >= self.max_subscribers:
+            raise HubFull()
+        subscriber = Subscriber(topic, self.queue_size)
+        self.topics.setdefault(topic, set()).add(subscriber)
+        self.subscriber_count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self.topics.get(subscriber.topic)
+        if subscribers and subscriber in subscribers:
+            subscribers.remove(subscriber)
+            self.subscriber_count -= 1
+            if not subscribers:
+                del self.topics[subscriber.topic]
+
+    def publish(self, topic: str, event: Event) -> int:
+        """Queue an event for every subscriber of a topic, returns how many got it"""
+        self.published += 1
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return 0
+
+        delivered = 0
+        for subscriber in list(subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+                delivered += 1
+            except asyncio.QueueFull:
+                # Too far behind: drop it, the client resumes via Last-Event-ID
+                self.slow_disconnects += 1
+                self.unsubscribe(subscriber)
+                subscriber.close()
+        self.delivered += delivered
+        return delivered
+
+    def close_all(self):
+        """End every open stream, used on shutdown"""
+        for subscribers in list(self.topics.values()):
+            for subscriber in list(subscribers):
+                self.unsubscribe(subscriber)
+                subscriber.close()
+
+    def has_subscribers(self, topic: str) -> bool:
+        return topic in self.topics
+
+    async def stream(self, subscriber: Subscriber, backlog: Iterable[Event] = (),
+                     heartbeat: float = SSE_HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+        """SSE bytes for one client: retry hint, backlog, then live events and heartbeats"""
+        sent_keys = set()
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode("utf-8")
+            for event in backlog:
+                if event.key is not None:
+                    sent_keys.add(event.key)
+                yield event.data
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if event is None:
+                    break
+                # Published while the backlog was being read
+                if event.key is not None and event.key in sent_keys:
+                    continue
+                yield event.data
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscriber_count,
+            "topics": len(self.topics),
+            "published": self.published,
+            "delivered": self.delivered,
+            "slow_disconnects": self.slow_disconnects,
+        }
+
+event_hub = EventHub(queue_size=SSE_QUEUE_SIZE, max_subscribers=SSE_MAX_SUBSCRIBERS)
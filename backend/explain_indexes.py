@@ -0,0 +1,110 @@
+"""Check that the hot queries are planned onto their indexes.
+
+    python explain_indexes.py
+
+Runs EXPLAIN for the feed, replies, session lookup, user page and moderation
+sweep queries against DATABASE_URL (SQLite or Postgres) after migrating it
+to head, prints the plans and exits non-zero if a query does not use its
+index. On Postgres sequential scans are disabled for the check, so the
+result does not depend on how much data the tables hold.
+
+tests/test_indexes.py runs the statements the handlers build themselves
+through EXPLAIN on SQLite, so the two cannot drift apart unnoticed.
+"""
+from datetime import datetime
+import asyncio
+import hashlib
+import sys
+import uuid
+
+from sqlalchemy import text
+
+from database import engine, init_db, IS_SQLITE
+
+FALSE = "0" if IS_SQLITE else "false"
+
+# The same filters and ordering the handlers in main.py use
+CHECKS = [
+    (
+        "feed",
+        ("ix_posts_feed",),
+        f"SELECT posts.id FROM posts WHERE posts.parent_id IS NULL AND posts.is_deleted = {FALSE} "
+        "ORDER BY posts.created_at DESC, posts.id DESC LIMIT 21",
+        {},
+    ),
+    (
+        "feed cursor page",
+        # Seeks to the cursor instead of walking the index from the top
+        ("ix_posts_feed ((created_at,id)<(?,?))", "Index Cond: (ROW("),
+        f"SELECT posts.id FROM posts WHERE posts.parent_id IS NULL AND posts.is_deleted = {FALSE} "
+        "AND (posts.created_at, posts.id) < (:before, :before_id) "
+        "ORDER BY posts.created_at DESC, posts.id DESC LIMIT 21",
+        {"before": datetime.utcnow(), "before_id": str(uuid.uuid4())},
+    ),
+    (
+        "replies",
+        ("ix_posts_replies",),
+        f"SELECT posts.id FROM posts WHERE posts.parent_id = :parent_id AND posts.is_deleted = {FALSE} "
+        "ORDER BY posts.created_at ASC, posts.id ASC LIMIT 21",
+        {"parent_id": str(uuid.uuid4())},
+    ),
+    (
+        "replies cursor page",
+        ("ix_posts_replies (parent_id=? AND (created_at,id)>(?,?))", "Index Cond: ((parent_id"),
+        f"SELECT posts.id FROM posts WHERE posts.parent_id = :parent_id AND posts.is_deleted = {FALSE} "
+        "AND (posts.created_at, posts.id) > (:after, :after_id) "
+        "ORDER BY posts.created_at ASC, posts.id ASC LIMIT 21",
+        {"parent_id": str(uuid.uuid4()), "after": datetime.utcnow(), "after_id": str(uuid.uuid4())},
+    ),
+    (
+        "session lookup",
+        # The unique constraint's index: sqlite_autoindex_* / sessions_token_hash_key
+        ("(token_hash=?)", "sessions_token_hash_key"),
+        "SELECT sessions.id FROM sessions WHERE sessions.token_hash = :token "
+        f"AND sessions.expires_at > :now AND sessions.revoked = {FALSE}",
+        {"token": hashlib.sha256(str(uuid.uuid4()).encode()).digest(), "now": datetime.utcnow()},
+    ),
+    (
+        "users page",
+        ("ix_users_created ((created_at,id)>(?,?))", "Index Cond: (ROW("),
+        "SELECT users.id FROM users WHERE (users.created_at, users.id) > (:after, :after_id) "
+        "ORDER BY users.created_at ASC, users.id ASC LIMIT 101",
+        {"after": datetime.utcnow(), "after_id": str(uuid.uuid4())},
+    ),
+    (
+        "moderation sweep",
+        ("ix_posts_unscored",),
+        f"SELECT posts.id, posts.body FROM posts WHERE posts.positivity_score IS NULL "
+        f"AND posts.is_deleted = {FALSE} AND posts.created_at < :before AND posts.id > :after_id "
+        "ORDER BY posts.id LIMIT 64",
+        {"before": datetime.utcnow(), "after_id": str(uuid.uuid4())},
+    ),
+]
+
+async def explain(connection, sql: str, params: dict) -> str:
+    if IS_SQLITE:
+        result = await connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+        return "\n".join(row[-1] for row in result)
+    result = await connection.execute(text(f"EXPLAIN {sql}"), params)
+    return "\n".join(row[0] for row in result)
+
+async def main() -> int:
+    await init_db()
+
+    failures = 0
+    async with engine.connect() as connection:
+        if not IS_SQLITE:
+            await connection.execute(text("SET enable_seqscan = off"))
+
+        for name, markers, sql, params in CHECKS:
+            plan = await explain(connection, sql, params)
+            used = any(marker in plan for marker in markers)
+            failures += 0 if used else 1
+            print(f"[{'ok' if used else 'FAIL'}] {name}: expects {' or '.join(markers)}")
+            print("    " + plan.replace("\n", "\n    "))
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
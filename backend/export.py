@@ -0,0 +1,173 @@
+"""Streaming NDJSON export of the posts (and users) tables.
+
+    python export.py --out posts.ndjson [--since 2026-01-01] [--until ...]
+    python export.py --out posts.ndjson --resume
+
+Rows come off a server-side cursor (yield_per) in (created_at, id) order and
+are written one partition at a time, so memory stays constant however large
+the table is. Each line carries the post id; exporting again with
+--after ID (or --resume, which reads the last id from the output file)
+continues right after that post. GET /admin/export/posts streams the same
+lines over HTTP, and GET /admin/users/stream does the same for users.
+"""
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session, engine
+from feed import keyset_after
+from models import Post, User
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_COLUMNS = (
+    Post.id,
+    Post.author_id,
+    User.handle.label("author_handle"),
+    User.display_name.label("author_display_name"),
+    Post.body,
+    Post.parent_id,
+    Post.like_count,
+    Post.reply_count,
+    Post.is_deleted,
+    Post.positivity_score,
+    Post.created_at,
+)
+
+# Admin user listing; never includes password hashes
+USER_COLUMNS = (
+    User.id,
+    User.email,
+    User.display_name,
+    User.handle,
+    User.email_verified,
+    User.created_at,
+)
+
+MAX_USERS_PAGE = 500
+
+def as_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Naive filter values are taken as UTC, like the stored timestamps"""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+async def checkpoint_position(db: AsyncSession, post_id: uuid.UUID) -> Optional[Tuple[datetime, uuid.UUID]]:
+    """(created_at, id) of the checkpoint post, None if it does not exist"""
+    result = await db.execute(select(Post.created_at).where(Post.id == post_id))
+    created_at = result.scalar_one_or_none()
+    return (created_at, post_id) if created_at is not None else None
+
+def export_stmt(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                after: Optional[Tuple[datetime, uuid.UUID]] = None, include_deleted: bool = False):
+    conditions = []
+    if since is not None:
+        conditions.append(Post.created_at >= as_utc(since))
+    if until is not None:
+        conditions.append(Post.created_at < as_utc(until))
+    if after is not None:
+        conditions.append(keyset_after(*after, descending=False))
+    if not include_deleted:
+        conditions.append(Post.is_deleted == False)
+
+    stmt = select(*EXPORT_COLUMNS).join(User, User.id == Post.author_id)
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+    return stmt.order_by(Post.created_at.asc(), Post.id.asc())
+
+def row_dict(row) -> dict:
+    """JSON-ready dict of a result row: UUIDs as strings, datetimes in ISO format"""
+    record = dict(row._mapping)
+    for key, value in record.items():
+        if isinstance(value, uuid.UUID):
+            record[key] = str(value)
+        elif isinstance(value, datetime):
+            record[key] = value.isoformat()
+    return record
+
+def row_json(row) -> bytes:
+    return json.dumps(row_dict(row), ensure_ascii=False).encode("utf-8") + b"\n"
+
+async def stream_ndjson(stmt, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """NDJSON chunks of batch_size rows each, read through a server-side cursor"""
+    async with async_session() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield b"".join(row_json(row) for row in partition)
+
+def stream_posts_ndjson(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        after: Optional[Tuple[datetime, uuid.UUID]] = None, include_deleted: bool = False,
+                        batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    return stream_ndjson(export_stmt(since, until, after, include_deleted), batch_size)
+
+def stream_users_ndjson(batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    stmt = select(*USER_COLUMNS).order_by(User.created_at.asc(), User.id.asc())
+    return stream_ndjson(stmt, batch_size)
+
+def last_exported_id(path: str) -> Optional[uuid.UUID]:
+    """Id on the last complete line of an export file.
+
+    A partial last line (an export that was killed mid-write) is cut off so
+    appending continues from a clean line boundary.
+    """
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        start = max(0, size - 64 * 1024)
+        f.seek(start)
+        tail = f.read()
+
+        complete_end = tail.rfind(b"\n") + 1
+        if complete_end < len(tail):
+            f.truncate(start + complete_end)
+        lines = tail[:complete_end].splitlines()
+        if start > 0:
+            lines = lines[1:]  # May have started before the block we read
+        return uuid.UUID(json.loads(lines[-1])["id"]) if lines else None
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Export posts as NDJSON")
+    parser.add_argument("--out", required=True, help="Output file, appended to when resuming")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only posts created at or after this time (UTC)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only posts created before this time (UTC)")
+    parser.add_argument("--after", type=uuid.UUID, help="Continue after this post id")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last post in --out")
+    parser.add_argument("--include-deleted", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    checkpoint_id = args.after
+    if args.resume and os.path.exists(args.out):
+        checkpoint_id = last_exported_id(args.out) or checkpoint_id
+
+    after = None
+    if checkpoint_id is not None:
+        async with async_session() as db:
+            after = await checkpoint_position(db, checkpoint_id)
+        if after is None:
+            print(f"Checkpoint post {checkpoint_id} not found", file=sys.stderr)
+            return 1
+        print(f"Resuming after post {checkpoint_id}", file=sys.stderr)
+
+    written = 0
+    with open(args.out, "ab" if checkpoint_id is not None else "wb") as out:
+        async for chunk in stream_posts_ndjson(args.since, args.until, after, args.include_deleted, args.batch_size):
+            out.write(chunk)
+            written += chunk.count(b"\n")
+    await engine.dispose()
+
+    print(f"Exported {written} post(s) to {args.out}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,59 @@
+"""Opt-in fast path that encodes ORM rows straight to JSON bytes.
+
+Enabled with FAST_JSON=1 when orjson is installed. Responses keep the
+schema and values of the pydantic response models (bench_json.py checks
+the two against each other) but skip building PostResponse objects and
+FastAPI's re-validation against response_model.
+"""
+from typing import Iterable, Optional, Set
+import os
+import uuid
+
+from fastapi import Response
+
+from feed import DELETED_BODY
+from models import Post
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON", "").lower() in ("1", "true", "yes")
+if FAST_JSON and orjson is None:
+    print("FAST_JSON is set but orjson is not installed, using the pydantic serializer")
+    FAST_JSON = False
+
+def dumps(content) -> bytes:
+    # OPT_UTC_Z writes UTC datetimes with a Z suffix, like pydantic
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+def json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def post_dict(post: Post, liked: Set[uuid.UUID]) -> dict:
+    """Same fields and order as schemas.PostResponse"""
+    return {
+        "id": post.id,
+        "body": post.body if not post.is_deleted else DELETED_BODY,
+        "author": {
+            "id": post.author.id,
+            "display_name": post.author.display_name,
+            "handle": post.author.handle,
+        } if not post.is_deleted else None,
+        "parent_id": post.parent_id,
+        "like_count": post.like_count,
+        "reply_count": post.reply_count,
+        "user_liked": post.id in liked,
+        "created_at": post.created_at,
+    }
+
+def post_list_json(posts: Iterable[Post], liked: Set[uuid.UUID], next_cursor: Optional[str]) -> bytes:
+    return dumps({"items": [post_dict(post, liked) for post in posts], "next_cursor": next_cursor})
+
+def post_detail_json(post: Post, replies: Iterable[Post], liked: Set[uuid.UUID], next_cursor: Optional[str]) -> bytes:
+    return dumps({
+        "post": post_dict(post, liked),
+        "replies": [post_dict(reply, liked) for reply in replies],
+        "next_cursor": next_cursor,
+    })
@@ -0,0 +1,275 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, tuple_
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, List, Set, Tuple
+from itertools import chain
+from datetime import datetime
+import uuid
+import os
+
+from models import Post, Like
+from cache import TTLCache, SingleFlight, BloomFilter
+from like_buffer import like_buffer
+from conditional import make_etag
+from schemas import PostResponse, UserResponse
+
+# Upper bounds for the feed page on GET /posts and the replies page on GET /posts/{post_id}
+MAX_FEED_PAGE = 100
+MAX_REPLIES_PAGE = 100
+
+def encode_cursor(row: Any) -> str:
+    """Keyset cursor (timestamp_id format) pointing just past a post (or user) row"""
+    return f"{row.created_at.isoformat()}_{row.id}"
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, uuid.UUID]]:
+    """Parse a cursor from encode_cursor, None if it is invalid"""
+    try:
+        timestamp_str, post_id = cursor.split("_")
+        return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00")), uuid.UUID(post_id)
+    except ValueError:
+        return None
+
+def keyset_after(created_at: datetime, row_id: uuid.UUID, descending: bool = True, model=Post):
+    """WHERE clause for the rows after a (created_at, id) position.
+
+    A row-value comparison, so SQLite and Postgres seek the (created_at, id)
+    index to the position instead of walking it from the first row.
+    """
+    position = tuple_(model.created_at, model.id)
+    return position < (created_at, row_id) if descending else position > (created_at, row_id)
+
+def after_cursor(cursor: Optional[str], descending: bool = True, model=Post):
+    """WHERE clause for the rows after a cursor in (created_at, id) order"""
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        return None
+    return keyset_after(*position, descending=descending, model=model)
+
+def feed_page_stmt(cursor: Optional[str], limit: int, *columns):
+    """Top-level posts after a cursor, newest first, with one extra row to detect more"""
+    stmt = select(*columns).where(
+        and_(Post.parent_id.is_(None), Post.is_deleted == False)
+    ).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+    position = after_cursor(cursor)
+    return stmt.where(position) if position is not None else stmt
+
+def feed_since_stmt(cursor: str, limit: int, *columns):
+    """Top-level posts newer than a cursor, oldest first, with one extra row to detect more"""
+    return select(*columns).where(
+        and_(Post.parent_id.is_(None), Post.is_deleted == False, after_cursor(cursor, descending=False))
+    ).order_by(Post.created_at.asc(), Post.id.asc()).limit(limit + 1)
+
+def replies_page_stmt(post_id: uuid.UUID, cursor: Optional[str], limit: int, *columns):
+    """Replies to a post after a cursor, oldest first, with one extra row to detect more"""
+    stmt = select(*columns).where(
+        and_(Post.parent_id == post_id, Post.is_deleted == False)
+    ).order_by(Post.created_at.asc(), Post.id.asc()).limit(limit + 1)
+    position = after_cursor(cursor, descending=False)
+    return stmt.where(position) if position is not None else stmt
+
+# Columns a page's validators are computed from, see page_validators
+VERSION_COLUMNS = (Post.id, Post.created_at, Post.like_count, Post.reply_count)
+
+def page_validators(entries: Iterable[Tuple], next_cursor: Optional[str], viewer_id: Optional[uuid.UUID] = None,
+                    *extra) -> Tuple[str, Optional[datetime]]:
+    """ETag and Last-Modified for a page of posts.
+
+    entries are (id, created_at, like_count, reply_count, user_liked) tuples
+    from row_entries, taken either from VERSION_COLUMNS rows or from loaded
+    Post objects, so both give the same ETag for the same data.
+    """
+    entries = list(entries)
+    etag = make_etag(viewer_id, next_cursor, extra, entries)
+    last_modified = max((entry[1] for entry in entries if entry[1] is not None), default=None)
+    return etag, last_modified
+
+def row_entries(rows: Iterable[Any], liked: Set[uuid.UUID]) -> List[Tuple]:
+    """Version entries for VERSION_COLUMNS rows or Post objects"""
+    return [(row.id, row.created_at, row.like_count, row.reply_count, row.id in liked) for row in rows]
+
+async def load_liked_post_ids(db: AsyncSession, post_ids: List[uuid.UUID], viewer_id: Optional[uuid.UUID] = None) -> Set[uuid.UUID]:
+    """Posts out of a page that the viewer has liked, in a single query"""
+    if not post_ids or not viewer_id:
+        return set()
+
+    # The viewer's filter rules out most ids, often all of them
+    candidates = await liked_filters.candidates(db, viewer_id, post_ids)
+    liked = set()
+    if candidates:
+        liked_stmt = select(Like.post_id).where(
+            and_(Like.post_id.in_(candidates), Like.user_id == viewer_id)
+        )
+        result = await db.execute(liked_stmt)
+        liked = set(result.scalars().all())
+    if like_buffer.enabled:
+        # Likes not yet flushed, so viewers see their own clicks
+        like_buffer.overlay(viewer_id, post_ids, liked)
+    return liked
+
+# Shown in place of a deleted post that still has replies
+DELETED_BODY = "[Post removed by author]"
+
+def post_response(post: Post, liked: Set[uuid.UUID]) -> PostResponse:
+    return PostResponse(
+        id=post.id,
+        body=post.body if not post.is_deleted else DELETED_BODY,
+        author=UserResponse(
+            id=post.author.id,
+            display_name=post.author.display_name,
+            handle=post.author.handle
+        ) if not post.is_deleted else None,
+        parent_id=post.parent_id,
+        like_count=post.like_count,
+        reply_count=post.reply_count,
+        user_liked=post.id in liked,
+        created_at=post.created_at
+    )
+
+class FeedPageCache:
+    """Serialized JSON pages of the anonymous feed (with their headers), keyed by (cursor, limit).
+
+    Logged-out visitors all see the same pages, so they are built once per
+    TTL. A miss under concurrent load runs a single rebuild, and invalidate()
+    bumps a generation so a rebuild that started before a write is neither
+    stored nor shared with requests arriving after it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.pages = TTLCache(maxsize, ttl)
+        self.flight = SingleFlight()
+        self.generation = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.pages.ttl > 0 and self.pages.maxsize > 0
+
+    async def get_or_build(self, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await build()
+
+        page = self.pages.get(key)
+        if page is not None:
+            return page
+
+        generation = self.generation
+
+        async def rebuild() -> Any:
+            page = await build()
+            if generation == self.generation:
+                self.pages.set(key, page)
+            return page
+
+        return await self.flight.do((generation, key), rebuild)
+
+    def invalidate(self):
+        self.generation += 1
+        self.invalidations += 1
+        self.pages.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.pages.stats(),
+            "rebuilds": self.flight.calls,
+            "shared_rebuilds": self.flight.shared,
+            "invalidations": self.invalidations,
+        }
+
+# FEED_CACHE_TTL=0 turns the cache off
+feed_cache = FeedPageCache(
+    maxsize=int(os.getenv("FEED_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("FEED_CACHE_TTL", "5"))
+)
+
+class LikedFilterCache:
+    """Per-user Bloom filters of liked post ids, so ids a viewer never liked skip the query.
+
+    A filter is built from all of the user's likes in one query, plus any
+    still in the write-behind buffer, and kept for `ttl` seconds. Likes made
+    through this process are added as they happen. Unlikes are left in,
+    since a Bloom filter cannot remove them; that only costs a false
+    positive that the IN query settles. Likes made through another worker
+    are missed until the filter expires. Users with more than max_items
+    likes get no filter and always query.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_items: int = 20000, error_rate: float = 0.01):
+        self.filters = TTLCache(maxsize, ttl)
+        self.flight = SingleFlight()
+        self.max_items = max_items
+        self.error_rate = error_rate
+        # Likes recorded while a user's filter is being built
+        self._building: Dict[uuid.UUID, Set[uuid.UUID]] = {}
+        self.skipped = 0
+        self.checked = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.filters.ttl > 0 and self.filters.maxsize > 0
+
+    async def candidates(self, db: AsyncSession, viewer_id: uuid.UUID, post_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        """The ids out of post_ids that the viewer may have liked"""
+        if not self.enabled:
+            return list(post_ids)
+
+        bloom = self.filters.get(viewer_id)
+        if bloom is None:
+            bloom = await self.flight.do(viewer_id, lambda: self._build(db, viewer_id))
+        if bloom is False:
+            return list(post_ids)
+
+        candidates = [post_id for post_id in post_ids if post_id.bytes in bloom]
+        self.skipped += len(post_ids) - len(candidates)
+        self.checked += len(candidates)
+        return candidates
+
+    async def _build(self, db: AsyncSession, viewer_id: uuid.UUID):
+        added = self._building.setdefault(viewer_id, set())
+        # Buffered likes are not in the table yet, and after the flush they are
+        # no longer in the buffer. Read before the query, so a flush that commits
+        # while it runs cannot drop them.
+        if like_buffer.enabled:
+            added.update(like_buffer.liked_by(viewer_id))
+        try:
+            result = await db.execute(
+                select(Like.post_id).where(Like.user_id == viewer_id).limit(self.max_items + 1)
+            )
+            post_ids = result.scalars().all()
+        finally:
+            self._building.pop(viewer_id, None)
+
+        if len(post_ids) > self.max_items:
+            bloom = False
+        else:
+            # Headroom for new likes before the false positive rate degrades
+            bloom = BloomFilter(max(2 * len(post_ids), 64), self.error_rate)
+            for post_id in chain(post_ids, added):
+                bloom.add(post_id.bytes)
+        self.filters.set(viewer_id, bloom)
+        return bloom
+
+    def add(self, user_id: uuid.UUID, post_id: uuid.UUID):
+        """Record a new like in the user's filter"""
+        building = self._building.get(user_id)
+        if building is not None:
+            building.add(post_id)
+        bloom = self.filters.peek(user_id)
+        if bloom:
+            bloom.add(post_id.bytes)
+            if bloom.full:
+                # Rebuilt with more room on next use
+                self.filters.pop(user_id)
+
+    def stats(self) -> dict:
+        return {
+            **self.filters.stats(),
+            "builds": self.flight.calls,
+            "ids_skipped": self.skipped,
+            "ids_checked": self.checked,
+        }
+
+# LIKED_FILTER_TTL=0 turns the filters off
+liked_filters = LikedFilterCache(
+    maxsize=int(os.getenv("LIKED_FILTER_SIZE", "10000")),
+    ttl=float(os.getenv("LIKED_FILTER_TTL", "60")),
+    max_items=int(os.getenv("LIKED_FILTER_MAX_ITEMS", "20000"))
+)
@@ -0,0 +1,334 @@
+"""Optional write-behind buffer for likes (LIKE_WRITE_BEHIND=1).
+
+With the buffer on, toggle_like keeps the wanted state of each (user, post)
+pair in memory and does not write it. Repeated clicks overwrite the same
+entry, so only the last state is written. Every LIKE_FLUSH_MS the buffer is
+written in one transaction: inserts with ON CONFLICT DO NOTHING, deletes,
+and like_count moved by the number of rows that actually changed.
+
+Each intent is appended to a write-ahead log in LIKE_WAL_DIR before the
+request returns. The log is split into segments, and a segment is deleted
+once its intents are committed. On startup any leftover segments are
+replayed before requests are served. Replaying is safe because applying
+the same intent twice changes nothing.
+
+The buffer belongs to one process. The WAL directory is locked, so every
+worker needs its own LIKE_WAL_DIR.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import time
+import uuid
+
+from sqlalchemy import bindparam, delete, select, tuple_, update
+
+from database import async_session, dialect_insert
+from models import Like, Post
+
+LIKE_WRITE_BEHIND = os.getenv("LIKE_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+LIKE_FLUSH_MS = int(os.getenv("LIKE_FLUSH_MS", "200"))
+LIKE_WAL_DIR = os.getenv("LIKE_WAL_DIR", "like_wal")
+LIKE_WAL_FSYNC = os.getenv("LIKE_WAL_FSYNC", "").lower() in ("1", "true", "yes")
+LIKE_BUFFER_MAX = int(os.getenv("LIKE_BUFFER_MAX", "100000"))
+
+# Rows per INSERT/DELETE statement, well under SQLite's bind parameter limit
+WRITE_CHUNK = 500
+
+# (user_id, post_id) -> (wanted state, state in the database before the first
+# buffered intent; None when unknown, i.e. replayed from the log)
+Key = Tuple[uuid.UUID, uuid.UUID]
+Intents = Dict[Key, Tuple[bool, Optional[bool]]]
+
+# Called after each committed flush with {post_id: parent_id} of the posts
+# whose like_count changed
+FlushHook = Callable[[Dict[uuid.UUID, Optional[uuid.UUID]]], None]
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class LikeBuffer:
+    def __init__(self, enabled: bool = False, wal_dir: str = "like_wal", flush_ms: int = 200,
+                 max_pending: int = 100000, fsync: bool = False):
+        self.enabled = enabled
+        self.wal_dir = wal_dir
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.on_flush: List[FlushHook] = []
+
+        self.pending: Intents = {}
+        self.pending_delta: Dict[uuid.UUID, int] = defaultdict(int)
+        # The batch being written; still counts as the current state until committed
+        self.flushing: Intents = {}
+        self.flushing_delta: Dict[uuid.UUID, int] = {}
+
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wal = None
+        self._wal_seq = 0
+        self._sealed: List[str] = []
+        self._dir_lock = None
+
+        self.intents = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.replayed = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+
+    def state(self, user_id: uuid.UUID, post_id: uuid.UUID) -> Optional[bool]:
+        """Buffered like state of a pair, or None if the database is current"""
+        key = (user_id, post_id)
+        entry = self.pending.get(key) or self.flushing.get(key)
+        return entry[0] if entry else None
+
+    def delta(self, post_id: uuid.UUID) -> int:
+        """How far the post's stored like_count is behind the buffered state"""
+        return self.pending_delta.get(post_id, 0) + self.flushing_delta.get(post_id, 0)
+
+    def liked_by(self, user_id: uuid.UUID) -> List[uuid.UUID]:
+        """Posts the user's buffered intents like (a scan of the whole buffer)"""
+        return [
+            post_id
+            for intents in (self.flushing, self.pending)
+            for (intent_user_id, post_id), (liked, _) in intents.items()
+            if liked and intent_user_id == user_id
+        ]
+
+    def overlay(self, viewer_id: uuid.UUID, post_ids: Iterable[uuid.UUID], liked: Set[uuid.UUID]):
+        """Apply the viewer's buffered intents to a set of liked post ids"""
+        for post_id in post_ids:
+            state = self.state(viewer_id, post_id)
+            if state is True:
+                liked.add(post_id)
+            elif state is False:
+                liked.discard(post_id)
+
+    def record(self, user_id: uuid.UUID, post_id: uuid.UUID, liked: bool, stored: Optional[bool] = None):
+        """Buffer an intent and log it; `stored` is the database state when the pair is not buffered yet"""
+        self._log(user_id, post_id, liked)
+        key = (user_id, post_id)
+        previous = self.pending.get(key)
+        if previous is not None:
+            baseline = previous[1]
+            if baseline is not None:
+                self.pending_delta[post_id] -= int(previous[0]) - int(baseline)
+        else:
+            # A batch being written sets the baseline the next batch starts from
+            flushing = self.flushing.get(key)
+            baseline = flushing[0] if flushing is not None else stored
+
+        if baseline is not None:
+            self.pending_delta[post_id] += int(liked) - int(baseline)
+        self.pending[key] = (liked, baseline)
+        self.intents += 1
+
+    async def reserve(self):
+        """Back-pressure: write the buffer out first when it is full"""
+        if len(self.pending) >= self.max_pending:
+            await self.flush()
+
+    # Write-ahead log
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.wal_dir, f"likes-{seq:010d}.wal")
+
+    def _open_segment(self):
+        self._wal_seq += 1
+        self._wal = open(self._segment_path(self._wal_seq), "a", encoding="utf-8")
+
+    def _seal_segment(self):
+        self._wal.close()
+        self._sealed.append(self._wal.name)
+        self._open_segment()
+
+    def _log(self, user_id: uuid.UUID, post_id: uuid.UUID, liked: bool):
+        self._wal.write(json.dumps({"u": str(user_id), "p": str(post_id), "l": int(liked)}) + "\n")
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+
+    def _replay(self):
+        """Load the intents of segments left behind by an earlier process"""
+        segments = sorted(glob.glob(os.path.join(self.wal_dir, "likes-*.wal")))
+        for path in segments:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        key = (uuid.UUID(record["u"]), uuid.UUID(record["p"]))
+                        liked = bool(record["l"])
+                    except (ValueError, KeyError):
+                        # A torn last line from a crash mid-write
+                        continue
+                    self.pending[key] = (liked, None)
+                    self.replayed += 1
+        self._sealed = segments
+        if segments:
+            self._wal_seq = int(os.path.basename(segments[-1])[6:16])
+
+    # Flushing
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            start = time.perf_counter()
+            batch, self.pending = self.pending, {}
+            self.flushing, self.pending_delta = batch, defaultdict(int)
+            self.flushing_delta = dict(self._deltas(batch))
+            self._seal_segment()
+            segments = list(self._sealed)
+
+            try:
+                changed, rows = await self._write(batch)
+            except Exception:
+                # Keep the batch; intents that arrived meanwhile still win
+                for key, (liked, baseline) in batch.items():
+                    newer = self.pending.get(key)
+                    self.pending[key] = (newer[0] if newer else liked, baseline)
+                self.pending_delta = self._deltas(self.pending)
+                raise
+            finally:
+                self.flushing, self.flushing_delta = {}, {}
+
+            for path in segments:
+                os.remove(path)
+            self._sealed = [path for path in self._sealed if path not in segments]
+
+            self.flushes += 1
+            self.rows_written += rows
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        if changed:
+            for hook in self.on_flush:
+                hook(changed)
+
+    @staticmethod
+    def _deltas(intents: Intents) -> Dict[uuid.UUID, int]:
+        deltas: Dict[uuid.UUID, int] = defaultdict(int)
+        for (_, post_id), (liked, baseline) in intents.items():
+            if baseline is not None and liked != baseline:
+                deltas[post_id] += 1 if liked else -1
+        return deltas
+
+    async def _write(self, batch: Intents) -> Tuple[Dict[uuid.UUID, Optional[uuid.UUID]], int]:
+        """Write a batch in one transaction, returns the changed posts' parents and the rows written"""
+        likes = [key for key, (liked, _) in batch.items() if liked]
+        unlikes = [key for key, (liked, _) in batch.items() if not liked]
+        deltas: Dict[uuid.UUID, int] = defaultdict(int)
+        rows = 0
+
+        async with async_session() as db:
+            # RETURNING only yields rows that really changed, so intents that
+            # are already in effect do not move the counters
+            for chunk in _chunks(likes, WRITE_CHUNK):
+                result = await db.execute(
+                    dialect_insert(Like)
+                    .values([{"user_id": user_id, "post_id": post_id} for user_id, post_id in chunk])
+                    .on_conflict_do_nothing()
+                    .returning(Like.post_id)
+                )
+                for post_id in result.scalars():
+                    deltas[post_id] += 1
+                    rows += 1
+            for chunk in _chunks(unlikes, WRITE_CHUNK):
+                result = await db.execute(
+                    delete(Like).where(tuple_(Like.user_id, Like.post_id).in_(chunk)).returning(Like.post_id)
+                )
+                for post_id in result.scalars():
+                    deltas[post_id] -= 1
+                    rows += 1
+
+            changed = {post_id: delta for post_id, delta in deltas.items() if delta}
+            parents: Dict[uuid.UUID, Optional[uuid.UUID]] = {}
+            if changed:
+                posts = Post.__table__
+                await db.execute(
+                    update(posts)
+                    .where(posts.c.id == bindparam("b_id"))
+                    .values(like_count=posts.c.like_count + bindparam("b_delta")),
+                    [{"b_id": post_id, "b_delta": delta} for post_id, delta in changed.items()]
+                )
+                result = await db.execute(select(Post.id, Post.parent_id).where(Post.id.in_(list(changed))))
+                parents = {row.id: row.parent_id for row in result}
+            await db.commit()
+        return parents, rows
+
+    # Lifecycle
+
+    async def start(self):
+        """Lock the WAL directory, write out anything left by a crash, then start flushing"""
+        if not self.enabled or self._task is not None:
+            return
+        os.makedirs(self.wal_dir, exist_ok=True)
+        self._dir_lock = open(os.path.join(self.wal_dir, "lock"), "w")
+        try:
+            fcntl.flock(self._dir_lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._dir_lock.close()
+            self._dir_lock = None
+            raise RuntimeError(f"{self.wal_dir} is in use by another process, give each worker its own LIKE_WAL_DIR")
+
+        self._replay()
+        self._open_segment()
+        await self.flush()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            # Still in the log, replayed on the next start
+            print(f"Final like flush failed: {type(e).__name__}: {str(e)}")
+        self._wal.close()
+        if os.path.getsize(self._wal.name) == 0:
+            os.remove(self._wal.name)
+        self._wal = None
+        self._dir_lock.close()
+        self._dir_lock = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.errors += 1
+                print(f"Like flush failed: {type(e).__name__}: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self.pending),
+            "flushing": len(self.flushing),
+            "intents": self.intents,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "replayed": self.replayed,
+            "last_flush_ms": self.last_flush_ms,
+            "errors": self.errors,
+        }
+
+like_buffer = LikeBuffer(
+    enabled=LIKE_WRITE_BEHIND,
+    wal_dir=LIKE_WAL_DIR,
+    flush_ms=LIKE_FLUSH_MS,
+    max_pending=LIKE_BUFFER_MAX,
+    fsync=LIKE_WAL_FSYNC
+)
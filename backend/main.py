@@ -1,25 +1,66 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Cookie, Response
+from fastapi import FastAPI, Depends, HTTPException, status, Cookie, Header, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session, selectinload  # Changed this line
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, update, literal, func, and_
 from contextlib import asynccontextmanager
 import uuid
-import bcrypt
+import os
 from datetime import datetime, timedelta
-from typing import Optional, List
-import re
+from typing import Optional, List, Set, Tuple
 import json
 
-from database import get_db, init_db
-from models import User, Post, Like, Session as DBSession, EmailVerificationToken, ModerationReport
+from database import get_db, init_db, async_session, pool_metrics, estimated_row_count, dialect_insert
+from feed import (
+    feed_cache, liked_filters, post_response, load_liked_post_ids, encode_cursor, decode_cursor, after_cursor,
+    feed_page_stmt, feed_since_stmt, replies_page_stmt,
+    page_validators, row_entries, VERSION_COLUMNS, MAX_FEED_PAGE, MAX_REPLIES_PAGE
+)
+from fast_json import FAST_JSON, dumps, json_response, post_list_json, post_detail_json
+from conditional import make_etag, etag_matches, cache_headers, not_modified
+from counters import adjust_reply_count, counter_broadcaster, counts_event
+from auth import UserSnapshot, session_cache, seconds_until, is_admin, hash_token
+from signed_sessions import SIGNED_SESSIONS, signed_sessions
+from positivity import check_positivity, reload_lexicon, load_classifier, POSITIVITY_ENGINE
+from moderation import moderation_pipeline
+from reaper import reaper
+from like_buffer import like_buffer
+from events import event_hub, encode_event, post_topic, HubFull
+from export import (
+    stream_posts_ndjson, stream_users_ndjson, checkpoint_position, row_dict, USER_COLUMNS, MAX_USERS_PAGE
+)
+from passwords import hash_password, verify_password, needs_rehash, PasswordPoolSaturated, pool_stats as password_pool_stats
+from models import User, Post, Like, Session as DBSession, EmailVerificationToken
 from schemas import *
 
+def likes_flushed(changed: dict):
+    """Buffered likes reached the database: refresh cached pages and live counters"""
+    feed_cache.invalidate()
+    for post_id, parent_id in changed.items():
+        counter_broadcaster.touch(post_id, parent_id)
+
+like_buffer.on_flush.append(likes_flushed)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database (remove await since init_db is now sync)
-    init_db()
+    # Initialize database
+    await init_db()
+    # Writes out likes left in the WAL by a crash before serving
+    await like_buffer.start()
+    if SIGNED_SESSIONS:
+        await signed_sessions.start()
+    moderation_pipeline.start()
+    counter_broadcaster.start()
+    reaper.start()
     yield
+    event_hub.close_all()
+    await like_buffer.stop()
+    await signed_sessions.stop()
+    await counter_broadcaster.stop()
+    await reaper.stop()
+    await moderation_pipeline.stop()
 
 app = FastAPI(
     title="Positive Micro-Journal API",
@@ -42,58 +83,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Simple profanity filter
-NEGATIVE_WORDS = [
-    "hate", "stupid", "idiot", "awful", "terrible", "horrible", 
-    "sucks", "worst", "fail", "loser", "pathetic"
-]
-
-def check_positivity(text: str) -> bool:
-    """Basic rule-based positivity check"""
-    text_lower = text.lower()
-    
-    # Check for negative words
-    for word in NEGATIVE_WORDS:
-        if word in text_lower:
-            return False
-    
-    # Check for excessive negativity patterns
-    negative_patterns = [
-        r"\b(not|never|can't|won't|don't|couldn't|shouldn't)\b.*\b(good|great|amazing|awesome)\b",
-        r"\b(everything|nothing).*\b(wrong|bad|terrible)\b"
-    ]
-    
-    for pattern in negative_patterns:
-        if re.search(pattern, text_lower):
-            return False
-    
-    return True
+SESSION_MAX_AGE = 30 * 24 * 60 * 60  # 30 days
 
 # Dependency to get current user
 async def get_current_user(
     session_token: Optional[str] = Cookie(None, alias="session"),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_db)
+) -> Optional[UserSnapshot]:
     if not session_token:
         return None
+
+    if SIGNED_SESSIONS:
+        # Checked against its signature, no lookup at all
+        return signed_sessions.verify(session_token)
+    
+    token_hash = hash_token(session_token)
+
+    # Most requests are answered from the session cache
+    cached_user = session_cache.get(token_hash)
+    if cached_user:
+        return cached_user
     
     # Query session and user
-    stmt = select(Session).options(selectinload(Session.user)).where(
+    stmt = select(DBSession).options(selectinload(DBSession.user)).where(
         and_(
-            Session.token_hash == session_token,
-            Session.expires_at > datetime.utcnow(),
-            Session.revoked == False
+            DBSession.token_hash == token_hash,
+            DBSession.expires_at > datetime.utcnow(),
+            DBSession.revoked == False
         )
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     session = result.scalar_one_or_none()
     
     if not session:
         return None
     
-    return session.user
+    user = UserSnapshot.from_user(session.user)
+    session_cache.set(token_hash, user, ttl=seconds_until(session.expires_at))
+    return user
 
-async def require_auth(current_user: User = Depends(get_current_user)) -> User:
+async def require_auth(current_user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
     if not current_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,15 +130,37 @@ async def require_auth(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
+async def require_admin(current_user: UserSnapshot = Depends(require_auth)) -> UserSnapshot:
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+def too_many_streams() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many open streams",
+        headers={"Retry-After": "5"}
+    )
+
+def password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
 # Auth endpoints
 @app.post("/auth/register", response_model=MessageResponse)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     try:
         print(f"Registration attempt - Email: {user_data.email}, Display name: {user_data.display_name}")
         
         # Check if user exists
         stmt = select(User).where(User.email == user_data.email)
-        result = db.execute(stmt)
+        result = await db.execute(stmt)
         existing_user = result.scalar_one_or_none()
         
         if existing_user:
@@ -119,9 +170,12 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
                 detail="Email already registered"
             )
         
-        # Create user with bcrypt password hashing
+        # Create user with bcrypt password hashing (off the event loop)
         print("Hashing password...")
-        hashed_password = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        try:
+            hashed_password = await hash_password(user_data.password)
+        except PasswordPoolSaturated:
+            raise password_pool_busy()
         
         print("Creating user object...")
         user = User(
@@ -136,10 +190,10 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         db.add(user)
         
         print("Committing to database...")
-        db.commit()
+        await db.commit()
         
         print("Refreshing user object...")
-        db.refresh(user)
+        await db.refresh(user)
         
         print(f"User created successfully with ID: {user.id}")
         
@@ -151,21 +205,21 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     except Exception as e:
         print(f"Unexpected error during registration: {type(e).__name__}: {str(e)}")
         print(f"Error details: {repr(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Registration failed: {str(e)}"
         )
 
 @app.post("/auth/verify-email", response_model=MessageResponse)
-async def verify_email(request: EmailVerification, db: Session = Depends(get_db)):
+async def verify_email(request: EmailVerification, db: AsyncSession = Depends(get_db)):
     stmt = select(EmailVerificationToken).where(
         and_(
             EmailVerificationToken.token == request.token,
             EmailVerificationToken.expires_at > datetime.utcnow()
         )
     )
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     token = result.scalar_one_or_none()
     
     if not token:
@@ -176,21 +230,21 @@ async def verify_email(request: EmailVerification, db: Session = Depends(get_db)
     
     # Update user
     user_stmt = select(User).where(User.id == token.user_id)
-    user_result = db.execute(user_stmt)
+    user_result = await db.execute(user_stmt)
     user = user_result.scalar_one()
     user.email_verified = True
     
     # Delete token
-    db.delete(token)
-    db.commit()
+    await db.delete(token)
+    await db.commit()
     
     return MessageResponse(message="Email verified successfully")
 
 @app.post("/auth/login")
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     # Find user
     stmt = select(User).where(User.email == credentials.email)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     
     if not user:
@@ -199,8 +253,13 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid credentials"
         )
     
-    # Verify password with bcrypt
-    if not bcrypt.checkpw(credentials.password.encode('utf-8'), user.password_hash.encode('utf-8')):
+    # Verify password with bcrypt (off the event loop)
+    try:
+        password_ok = await verify_password(credentials.password, user.password_hash)
+    except PasswordPoolSaturated:
+        raise password_pool_busy()
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -212,16 +271,25 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Please verify your email first"
         )
     
-    # Create session
-    session_token = str(uuid.uuid4())
-    session = Session(
-        user_id=user.id,
-        token_hash=session_token,
-        expires_at=datetime.utcnow() + timedelta(days=30)
-    )
+    # Upgrade hashes made with an older, cheaper cost factor
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password(credentials.password)
+        except PasswordPoolSaturated:
+            pass  # Try again on a later login
     
-    db.add(session)
-    db.commit()
+    # Create session
+    if SIGNED_SESSIONS:
+        session_token = signed_sessions.issue(UserSnapshot.from_user(user), SESSION_MAX_AGE)
+    else:
+        session_token = str(uuid.uuid4())
+        session = DBSession(
+            user_id=user.id,
+            token_hash=hash_token(session_token),
+            expires_at=datetime.utcnow() + timedelta(seconds=SESSION_MAX_AGE)
+        )
+        db.add(session)
+    await db.commit()
     
     # Create proper JSON response
     from fastapi import Response
@@ -247,24 +315,28 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         httponly=True,
         secure=False,  # Set to False for localhost
         samesite="lax",
-        max_age=30 * 24 * 60 * 60  # 30 days
+        max_age=SESSION_MAX_AGE
     )
     
     return response
 
 @app.post("/auth/logout", response_model=MessageResponse)
 async def logout(
-    current_user: User = Depends(require_auth),
+    current_user: UserSnapshot = Depends(require_auth),
     session_token: Optional[str] = Cookie(None, alias="session"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    if session_token:
-        stmt = select(Session).where(Session.token_hash == session_token)
-        result = db.execute(stmt)
+    if session_token and SIGNED_SESSIONS:
+        await signed_sessions.revoke(db, session_token)
+    elif session_token:
+        token_hash = hash_token(session_token)
+        session_cache.pop(token_hash)
+        stmt = select(DBSession).where(DBSession.token_hash == token_hash)
+        result = await db.execute(stmt)
         session = result.scalar_one_or_none()
         if session:
             session.revoked = True
-            db.commit()
+            await db.commit()
     
     from fastapi import Response
     resp = Response(content='{"message": "Logged out successfully"}')
@@ -273,7 +345,7 @@ async def logout(
 
 # User endpoints
 @app.get("/users/me", response_model=UserProfile)
-async def get_my_profile(current_user: User = Depends(require_auth)):
+async def get_my_profile(current_user: UserSnapshot = Depends(require_auth)):
     return UserProfile(
         id=current_user.id,
         email=current_user.email,
@@ -283,20 +355,31 @@ async def get_my_profile(current_user: User = Depends(require_auth)):
     )
 
 @app.get("/users/{user_id}", response_model=PublicUserProfile)
-async def get_user_profile(user_id: uuid.UUID, db: Session = Depends(get_db)):
+async def get_user_profile(
+    user_id: uuid.UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
     stmt = select(User).where(User.id == user_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get post count
-    post_count_stmt = select(func.count(Post.id)).where(
+    # Get post count, and the newest post for Last-Modified
+    post_count_stmt = select(func.count(Post.id), func.max(Post.created_at)).where(
         and_(Post.author_id == user_id, Post.is_deleted == False)
     )
-    post_count_result = db.execute(post_count_stmt)
-    post_count = post_count_result.scalar()
+    post_count_result = await db.execute(post_count_stmt)
+    post_count, last_post_at = post_count_result.one()
+    
+    etag = make_etag(user.id, user.display_name, user.handle, user.created_at, post_count)
+    headers = cache_headers(etag, last_post_at or user.created_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
     
     return PublicUserProfile(
         id=user.id,
@@ -307,33 +390,16 @@ async def get_user_profile(user_id: uuid.UUID, db: Session = Depends(get_db)):
     )
 
 # Post endpoints
-@app.get("/posts", response_model=PostList)
-async def get_posts(
-    cursor: Optional[str] = None,
-    limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user)
-):
-    # Build query for top-level posts only
-    stmt = select(Post).options(selectinload(Post.author)).where(
-        and_(Post.parent_id.is_(None), Post.is_deleted == False)
-    ).order_by(Post.created_at.desc()).limit(limit + 1)
-    
-    if cursor:
-        # Parse cursor (timestamp_id format)
-        try:
-            timestamp_str, post_id = cursor.split("_")
-            cursor_time = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-            stmt = stmt.where(
-                or_(
-                    Post.created_at < cursor_time,
-                    and_(Post.created_at == cursor_time, Post.id < uuid.UUID(post_id))
-                )
-            )
-        except:
-            pass  # Invalid cursor, ignore
-    
-    result = db.execute(stmt)
+async def load_feed_page(
+    db: AsyncSession,
+    cursor: Optional[str],
+    limit: int,
+    viewer_id: Optional[uuid.UUID] = None
+) -> Tuple[List[Post], Set[uuid.UUID], Optional[str]]:
+    """A page of the feed as (posts, ids the viewer liked, next cursor)"""
+    # Top-level posts only, an invalid cursor is ignored
+    stmt = feed_page_stmt(cursor, limit, Post).options(selectinload(Post.author))
+    result = await db.execute(stmt)
     posts = result.scalars().all()
     
     # Check if there are more posts
@@ -341,58 +407,115 @@ async def get_posts(
     if has_more:
         posts = posts[:-1]
     
-    # Get like counts and user likes
-    post_items = []
-    for post in posts:
-        # Get like count
-        like_count_stmt = select(func.count(Like.post_id)).where(Like.post_id == post.id)
-        like_count_result = db.execute(like_count_stmt)
-        like_count = like_count_result.scalar()
-        
-        # Check if current user liked
-        user_liked = False
-        if current_user:
-            user_like_stmt = select(Like).where(
-                and_(Like.post_id == post.id, Like.user_id == current_user.id)
-            )
-            user_like_result = db.execute(user_like_stmt)
-            user_liked = user_like_result.scalar_one_or_none() is not None
-        
-        # Get reply count
-        reply_count_stmt = select(func.count(Post.id)).where(
-            and_(Post.parent_id == post.id, Post.is_deleted == False)
-        )
-        reply_count_result = db.execute(reply_count_stmt)
-        reply_count = reply_count_result.scalar()
-        
-        post_items.append(PostResponse(
-            id=post.id,
-            body=post.body,
-            author=UserResponse(
-                id=post.author.id,
-                display_name=post.author.display_name,
-                handle=post.author.handle
-            ),
-            parent_id=post.parent_id,
-            like_count=like_count,
-            reply_count=reply_count,
-            user_liked=user_liked,
-            created_at=post.created_at
-        ))
+    # Like and reply counts are on the rows, user likes for the whole page in one query
+    liked = await load_liked_post_ids(db, [post.id for post in posts], viewer_id)
     
     # Generate next cursor
     next_cursor = None
     if has_more and posts:
-        last_post = posts[-1]
-        next_cursor = f"{last_post.created_at.isoformat()}_{last_post.id}"
+        next_cursor = encode_cursor(posts[-1])
+    
+    return posts, liked, next_cursor
+
+def render_feed_page(posts: List[Post], liked: Set[uuid.UUID], next_cursor: Optional[str]) -> bytes:
+    if FAST_JSON:
+        return post_list_json(posts, liked, next_cursor)
+    page = PostList(items=[post_response(post, liked) for post in posts], next_cursor=next_cursor)
+    return page.model_dump_json().encode("utf-8")
+
+@app.get("/posts", response_model=PostList)
+async def get_posts(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[UserSnapshot] = Depends(get_current_user)
+):
+    # Clamped before they become part of the shared cache key; a cursor that
+    # does not parse gives the first page, so it shares that page's entry
+    limit = max(1, min(limit, MAX_FEED_PAGE))
+    if cursor and decode_cursor(cursor) is None:
+        cursor = None
+    
+    if current_user:
+        if if_none_match:
+            # Revalidate from the page's ids and counters alone
+            result = await db.execute(feed_page_stmt(cursor, limit, *VERSION_COLUMNS))
+            rows = result.all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            liked = await load_liked_post_ids(db, [row.id for row in rows], current_user.id)
+            next_cursor = encode_cursor(rows[-1]) if has_more and rows else None
+            headers = cache_headers(
+                *page_validators(row_entries(rows, liked), next_cursor, current_user.id), private=True
+            )
+            if etag_matches(if_none_match, headers["ETag"]):
+                return not_modified(headers)
+        
+        posts, liked, next_cursor = await load_feed_page(db, cursor, limit, current_user.id)
+        headers = cache_headers(
+            *page_validators(row_entries(posts, liked), next_cursor, current_user.id), private=True
+        )
+        if FAST_JSON:
+            return json_response(post_list_json(posts, liked, next_cursor), headers)
+        response.headers.update(headers)
+        return PostList(items=[post_response(post, liked) for post in posts], next_cursor=next_cursor)
+    
+    # Logged-out visitors share cached pages of already serialized JSON
+    async def build() -> Tuple[bytes, dict]:
+        posts, liked, next_cursor = await load_feed_page(db, cursor, limit)
+        headers = cache_headers(*page_validators(row_entries(posts, liked), next_cursor))
+        return render_feed_page(posts, liked, next_cursor), headers
+    
+    body, headers = await feed_cache.get_or_build((cursor, limit), build)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    return json_response(body, headers)
+
+# Posts a reconnecting client can catch up on before it is told to reload
+SSE_REPLAY_LIMIT = int(os.getenv("SSE_REPLAY_LIMIT", "100"))
+
+def new_post_event(post: Post, item: PostResponse):
+    return encode_event("post", item.model_dump_json(), event_id=encode_cursor(post), key=str(post.id))
+
+@app.get("/posts/stream")
+async def stream_posts(last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events for new top-level posts; event ids are feed cursors"""
+    try:
+        subscriber = event_hub.subscribe("posts")
+    except HubFull:
+        raise too_many_streams()
+    
+    # Subscribed first, so posts created while the backlog is read are not
+    # missed (the stream skips the ones already sent). The session is only
+    # held for this query, never for the lifetime of the stream.
+    backlog = []
+    try:
+        if last_event_id and decode_cursor(last_event_id):
+            async with async_session() as db:
+                stmt = feed_since_stmt(last_event_id, SSE_REPLAY_LIMIT, Post).options(selectinload(Post.author))
+                result = await db.execute(stmt)
+                posts = result.scalars().all()
+            if len(posts) > SSE_REPLAY_LIMIT:
+                backlog = [encode_event("reset", "{}")]
+            else:
+                backlog = [new_post_event(post, post_response(post, set())) for post in posts]
+    except Exception:
+        event_hub.unsubscribe(subscriber)
+        raise
     
-    return PostList(items=post_items, next_cursor=next_cursor)
+    return StreamingResponse(
+        event_hub.stream(subscriber, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/posts", response_model=PostResponse)
 async def create_post(
     post_data: PostCreate,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
 ):
     # Check positivity
     if not check_positivity(post_data.body):
@@ -404,7 +527,7 @@ async def create_post(
     # Check if parent exists (for replies)
     if post_data.parent_id:
         parent_stmt = select(Post).where(Post.id == post_data.parent_id)
-        parent_result = db.execute(parent_stmt)
+        parent_result = await db.execute(parent_stmt)
         parent_post = parent_result.scalar_one_or_none()
         if not parent_post:
             raise HTTPException(status_code=404, detail="Parent post not found")
@@ -417,10 +540,16 @@ async def create_post(
     )
     
     db.add(post)
-    db.commit()
-    db.refresh(post, ["author"])
+    if post.parent_id:
+        await adjust_reply_count(db, post.parent_id, 1)
+    await db.commit()
+    await db.refresh(post)
+    feed_cache.invalidate()
     
-    return PostResponse(
+    # Heavier scoring happens off the request path
+    moderation_pipeline.submit(post.id, post.body)
+    
+    item = PostResponse(
         id=post.id,
         body=post.body,
         author=UserResponse(
@@ -434,98 +563,119 @@ async def create_post(
         user_liked=False,
         created_at=post.created_at
     )
+    
+    if post.parent_id is None and event_hub.has_subscribers("posts"):
+        event_hub.publish("posts", new_post_event(post, item))
+    elif post.parent_id is not None:
+        counter_broadcaster.touch(post.parent_id)
+    
+    return item
 
 @app.get("/posts/{post_id}", response_model=PostDetail)
 async def get_post_detail(
     post_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user)
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[UserSnapshot] = Depends(get_current_user)
 ):
+    limit = max(1, min(limit, MAX_REPLIES_PAGE))
+    viewer_id = current_user.id if current_user else None
+    
+    if if_none_match:
+        # Revalidate from ids and counters alone before loading bodies and authors
+        result = await db.execute(select(*VERSION_COLUMNS, Post.is_deleted).where(Post.id == post_id))
+        post_row = result.one_or_none()
+        if post_row:
+            result = await db.execute(replies_page_stmt(post_id, cursor, limit, *VERSION_COLUMNS))
+            reply_rows = result.all()
+            has_more = len(reply_rows) > limit
+            reply_rows = reply_rows[:limit]
+            liked = await load_liked_post_ids(db, [post_id] + [row.id for row in reply_rows], viewer_id)
+            next_cursor = encode_cursor(reply_rows[-1]) if has_more and reply_rows else None
+            headers = cache_headers(
+                *page_validators(row_entries([post_row] + reply_rows, liked), next_cursor, viewer_id, post_row.is_deleted),
+                private=current_user is not None
+            )
+            if etag_matches(if_none_match, headers["ETag"]):
+                return not_modified(headers)
+    
     # Get main post
     stmt = select(Post).options(selectinload(Post.author)).where(Post.id == post_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     post = result.scalar_one_or_none()
     
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Get like count and user like status
-    like_count_stmt = select(func.count(Like.post_id)).where(Like.post_id == post.id)
-    like_count_result = db.execute(like_count_stmt)
-    like_count = like_count_result.scalar()
+    # Get one page of replies, oldest first
+    replies_stmt = replies_page_stmt(post_id, cursor, limit, Post).options(selectinload(Post.author))
+    replies_result = await db.execute(replies_stmt)
+    replies = replies_result.scalars().all()
     
-    user_liked = False
-    if current_user:
-        user_like_stmt = select(Like).where(
-            and_(Like.post_id == post.id, Like.user_id == current_user.id)
-        )
-        user_like_result = db.execute(user_like_stmt)
-        user_liked = user_like_result.scalar_one_or_none() is not None
+    has_more = len(replies) > limit
+    if has_more:
+        replies = replies[:-1]
     
-    # Get replies
-    replies_stmt = select(Post).options(selectinload(Post.author)).where(
-        and_(Post.parent_id == post_id, Post.is_deleted == False)
-    ).order_by(Post.created_at.asc())
+    # Liked-by-me for the post and the whole page of replies in one query
+    liked = await load_liked_post_ids(db, [post.id] + [reply.id for reply in replies], viewer_id)
     
-    replies_result = db.execute(replies_stmt)
-    replies = replies_result.scalars().all()
+    next_cursor = encode_cursor(replies[-1]) if has_more and replies else None
     
-    reply_items = []
-    for reply in replies:
-        # Get reply like count
-        reply_like_count_stmt = select(func.count(Like.post_id)).where(Like.post_id == reply.id)
-        reply_like_count_result = db.execute(reply_like_count_stmt)
-        reply_like_count = reply_like_count_result.scalar()
-        
-        # Check if user liked reply
-        reply_user_liked = False
-        if current_user:
-            reply_user_like_stmt = select(Like).where(
-                and_(Like.post_id == reply.id, Like.user_id == current_user.id)
-            )
-            reply_user_like_result = db.execute(reply_user_like_stmt)
-            reply_user_liked = reply_user_like_result.scalar_one_or_none() is not None
-        
-        reply_items.append(PostResponse(
-            id=reply.id,
-            body=reply.body,
-            author=UserResponse(
-                id=reply.author.id,
-                display_name=reply.author.display_name,
-                handle=reply.author.handle
-            ),
-            parent_id=reply.parent_id,
-            like_count=reply_like_count,
-            reply_count=0,  # No nested replies for now
-            user_liked=reply_user_liked,
-            created_at=reply.created_at
-        ))
-    
-    main_post = PostResponse(
-        id=post.id,
-        body=post.body if not post.is_deleted else "[Post removed by author]",
-        author=UserResponse(
-            id=post.author.id,
-            display_name=post.author.display_name,
-            handle=post.author.handle
-        ) if not post.is_deleted else None,
-        parent_id=post.parent_id,
-        like_count=like_count,
-        reply_count=len(reply_items),
-        user_liked=user_liked,
-        created_at=post.created_at
+    headers = cache_headers(
+        *page_validators(row_entries([post] + replies, liked), next_cursor, viewer_id, post.is_deleted),
+        private=current_user is not None
     )
+    if FAST_JSON:
+        return json_response(post_detail_json(post, replies, liked, next_cursor), headers)
+    response.headers.update(headers)
+    
+    return PostDetail(
+        post=post_response(post, liked),
+        replies=[post_response(reply, liked) for reply in replies],
+        next_cursor=next_cursor
+    )
+
+@app.get("/posts/{post_id}/stream")
+async def stream_post_counts(post_id: uuid.UUID):
+    """Server-Sent Events with coalesced like/reply counts for a post and its replies"""
+    try:
+        subscriber = event_hub.subscribe(post_topic(post_id))
+    except HubFull:
+        raise too_many_streams()
+    
+    # Current counts go out first; anything that changes after subscribing
+    # follows as live events, so no update falls in between
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Post.id, Post.like_count, Post.reply_count).where(Post.id == post_id)
+            )
+            row = result.one_or_none()
+    except Exception:
+        event_hub.unsubscribe(subscriber)
+        raise
+    
+    if row is None:
+        event_hub.unsubscribe(subscriber)
+        raise HTTPException(status_code=404, detail="Post not found")
     
-    return PostDetail(post=main_post, replies=reply_items)
+    return StreamingResponse(
+        event_hub.stream(subscriber, [counts_event(row)]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.delete("/posts/{post_id}", response_model=MessageResponse)
 async def delete_post(
     post_id: uuid.UUID,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
 ):
     stmt = select(Post).where(Post.id == post_id)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     post = result.scalar_one_or_none()
     
     if not post:
@@ -534,8 +684,20 @@ async def delete_post(
     if post.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    post.is_deleted = True
-    db.commit()
+    # Only the request that flips is_deleted moves the parent's counter
+    result = await db.execute(
+        update(Post).where(and_(Post.id == post_id, Post.is_deleted == False))
+        .values(is_deleted=True)
+        .returning(Post.parent_id)
+    )
+    deleted = result.first()
+    if deleted is not None:
+        if deleted.parent_id:
+            await adjust_reply_count(db, deleted.parent_id, -1)
+        await db.commit()
+        feed_cache.invalidate()
+        if deleted.parent_id:
+            counter_broadcaster.touch(deleted.parent_id)
     
     return MessageResponse(message="Post deleted successfully")
 
@@ -543,64 +705,207 @@ async def delete_post(
 @app.post("/posts/{post_id}/like", response_model=LikeResponse)
 async def toggle_like(
     post_id: uuid.UUID,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if post exists
     post_stmt = select(Post).where(Post.id == post_id)
-    post_result = db.execute(post_stmt)
+    post_result = await db.execute(post_stmt)
     post = post_result.scalar_one_or_none()
     
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
+
+    if like_buffer.enabled:
+        return await buffered_like(post_id, current_user.id, db)
     
     # Check if user already liked
-    like_stmt = select(Like).where(
+    like_stmt = select(Like.post_id).where(
         and_(Like.post_id == post_id, Like.user_id == current_user.id)
     )
-    like_result = db.execute(like_stmt)
-    existing_like = like_result.scalar_one_or_none()
+    like_result = await db.execute(like_stmt)
+    liked = like_result.scalar_one_or_none() is None
     
-    if existing_like:
-        # Unlike
-        db.delete(existing_like)
-        liked = False
+    # The write itself is conditional, so concurrent toggles cannot count twice
+    return await set_like(post_id, current_user.id, liked, db)
+
+async def buffered_like(post_id: uuid.UUID, user_id: uuid.UUID, db: AsyncSession,
+                        liked: Optional[bool] = None) -> LikeResponse:
+    """Like endpoints in write-behind mode: record the intent (liked=None toggles), answer from the buffer"""
+    await like_buffer.reserve()
+
+    current = like_buffer.state(user_id, post_id)
+    stored = None
+    if current is None:
+        like_result = await db.execute(
+            select(Like.post_id).where(and_(Like.post_id == post_id, Like.user_id == user_id))
+        )
+        stored = like_result.scalar_one_or_none() is not None
+        # The pair may have been buffered while we were reading
+        current = like_buffer.state(user_id, post_id)
+        if current is None:
+            current = stored
+
+    wanted = not current if liked is None else liked
+    if wanted != current:
+        like_buffer.record(user_id, post_id, wanted, stored)
+        if wanted:
+            liked_filters.add(user_id, post_id)
+
+    # The row may be older than a flush that ran since, so re-read the counter
+    count_result = await db.execute(select(Post.like_count).where(Post.id == post_id))
+    like_count = count_result.scalar() + like_buffer.delta(post_id)
+    return LikeResponse(liked=wanted, like_count=like_count)
+
+async def set_like(post_id: uuid.UUID, user_id: uuid.UUID, liked: bool, db: AsyncSession) -> LikeResponse:
+    """Put a like into the wanted state with one conditional write; repeating it changes nothing"""
+    if like_buffer.enabled:
+        exists = await db.execute(select(Post.id).where(Post.id == post_id))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        return await buffered_like(post_id, user_id, db, liked)
+
+    if liked:
+        # Selecting from posts makes a missing post insert nothing
+        stmt = dialect_insert(Like).from_select(
+            ["post_id", "user_id"],
+            select(Post.id, literal(user_id, Like.user_id.type)).where(Post.id == post_id)
+        ).on_conflict_do_nothing().returning(Like.post_id)
     else:
-        # Like
-        like = Like(post_id=post_id, user_id=current_user.id)
-        db.add(like)
-        liked = True
-    
-    db.commit()
-    
-    # Get updated like count
-    count_stmt = select(func.count(Like.post_id)).where(Like.post_id == post_id)
-    count_result = db.execute(count_stmt)
-    like_count = count_result.scalar()
-    
-    return LikeResponse(liked=liked, like_count=like_count)
+        stmt = delete(Like).where(
+            and_(Like.post_id == post_id, Like.user_id == user_id)
+        ).returning(Like.post_id)
+    changed = (await db.execute(stmt)).first() is not None
+
+    if changed:
+        count_result = await db.execute(
+            update(Post).where(Post.id == post_id)
+            .values(like_count=Post.like_count + (1 if liked else -1))
+            .returning(Post.like_count, Post.parent_id)
+        )
+    else:
+        # Already in the wanted state, or no such post
+        count_result = await db.execute(select(Post.like_count, Post.parent_id).where(Post.id == post_id))
+    row = count_result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    await db.commit()
+
+    if changed:
+        feed_cache.invalidate()
+        counter_broadcaster.touch(post_id, row.parent_id)
+        if liked:
+            liked_filters.add(user_id, post_id)
+    return LikeResponse(liked=liked, like_count=row.like_count)
+
+@app.put("/posts/{post_id}/like", response_model=LikeResponse)
+async def like_post(
+    post_id: uuid.UUID,
+    current_user: UserSnapshot = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
+):
+    return await set_like(post_id, current_user.id, True, db)
 
-# Admin endpoint for debugging
+@app.delete("/posts/{post_id}/like", response_model=LikeResponse)
+async def unlike_post(
+    post_id: uuid.UUID,
+    current_user: UserSnapshot = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
+):
+    return await set_like(post_id, current_user.id, False, db)
+
+@app.post("/likes/lookup", response_model=LikeLookupResponse)
+async def lookup_likes(
+    request: LikeLookupRequest,
+    current_user: UserSnapshot = Depends(require_auth),
+    db: AsyncSession = Depends(get_db)
+):
+    """Which of the given posts the viewer has liked, for personalizing a shared feed page"""
+    post_ids = list(dict.fromkeys(request.post_ids))
+    liked = await load_liked_post_ids(db, post_ids, current_user.id)
+    return LikeLookupResponse(liked=[post_id for post_id in post_ids if post_id in liked])
+
+# Admin endpoints
 @app.get("/admin/users")
-async def list_users(db: Session = Depends(get_db)):
-    """Debug endpoint to list all users"""
-    stmt = select(User)
-    result = db.execute(stmt)
-    users = result.scalars().all()
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    admin: UserSnapshot = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Every user, oldest first, one page at a time"""
+    limit = max(1, min(limit, MAX_USERS_PAGE))
+    stmt = select(*USER_COLUMNS).order_by(User.created_at.asc(), User.id.asc()).limit(limit + 1)
+    position = after_cursor(cursor, descending=False, model=User)
+    if position is not None:
+        stmt = stmt.where(position)
+    
+    result = await db.execute(stmt)
+    rows = result.all()
     
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[:-1]
+    
+    content = {
+        # Planner estimate, so the page never costs a full table count
+        "total_users": await estimated_row_count(db, User.__table__),
+        "total_users_estimated": True,
+        "users": [row_dict(row) for row in rows],
+        "next_cursor": encode_cursor(rows[-1]) if has_more and rows else None
+    }
+    return json_response(dumps(content)) if FAST_JSON else content
+
+@app.get("/admin/users/stream")
+async def stream_users(admin: UserSnapshot = Depends(require_admin)):
+    """Every user as NDJSON, oldest first, read through a server-side cursor"""
+    return StreamingResponse(stream_users_ndjson(), media_type="application/x-ndjson")
+
+@app.get("/admin/export/posts")
+async def export_posts(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[uuid.UUID] = None,
+    include_deleted: bool = False,
+    admin: UserSnapshot = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream every post as NDJSON, oldest first; pass the last id seen as `after` to resume"""
+    position = None
+    if after:
+        position = await checkpoint_position(db, after)
+        if position is None:
+            raise HTTPException(status_code=400, detail="Checkpoint post not found")
+    
+    # The stream reads through its own session and server-side cursor
+    return StreamingResponse(
+        stream_posts_ndjson(since, until, position, include_deleted),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="posts.ndjson"'}
+    )
+
+@app.post("/admin/positivity/reload")
+async def reload_positivity_lexicon(admin: UserSnapshot = Depends(require_admin)):
+    """Debug endpoint to reload the negative word list (and classifier model) without a restart"""
+    if POSITIVITY_ENGINE == "classifier":
+        load_classifier()
+    return {"engine": POSITIVITY_ENGINE, "words": reload_lexicon()}
+
+@app.get("/admin/metrics")
+async def get_metrics(admin: UserSnapshot = Depends(require_admin)):
+    """Debug endpoint exposing in-process performance counters"""
     return {
-        "total_users": len(users),
-        "users": [
-            {
-                "id": str(user.id),
-                "email": user.email,
-                "display_name": user.display_name,
-                "handle": user.handle,
-                "email_verified": user.email_verified,
-                "created_at": user.created_at.isoformat() if user.created_at else None
-            }
-            for user in users
-        ]
+        "db_pool": pool_metrics(),
+        "session_cache": session_cache.stats(),
+        "feed_cache": feed_cache.stats(),
+        "password_pool": password_pool_stats(),
+        "moderation": moderation_pipeline.stats(),
+        "events": event_hub.stats(),
+        "counter_broadcast": counter_broadcaster.stats(),
+        "like_buffer": like_buffer.stats(),
+        "liked_filters": liked_filters.stats(),
+        "signed_sessions": signed_sessions.stats(),
+        "reaper": reaper.stats()
     }
 
 # Health check
@@ -0,0 +1,106 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00
+
+The tables as they existed when the schema was still created by
+Base.metadata.create_all. Tables that already exist are left alone, so
+databases created that way can be stamped forward without data loss.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", UUID(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("email_verified", sa.Boolean(), nullable=True),
+            sa.Column("password_hash", sa.Text(), nullable=False),
+            sa.Column("display_name", sa.String(40), nullable=False),
+            sa.Column("handle", sa.String(30), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_handle", "users", ["handle"], unique=True)
+
+    if "sessions" not in existing:
+        op.create_table(
+            "sessions",
+            sa.Column("id", UUID(), primary_key=True),
+            sa.Column("user_id", UUID(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("token_hash", sa.Text(), nullable=False, unique=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("revoked", sa.Boolean(), nullable=True),
+        )
+        op.create_index("ix_sessions_user_id", "sessions", ["user_id"])
+
+    if "posts" not in existing:
+        op.create_table(
+            "posts",
+            sa.Column("id", UUID(), primary_key=True),
+            sa.Column("author_id", UUID(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("body", sa.String(140), nullable=False),
+            sa.Column("parent_id", UUID(), sa.ForeignKey("posts.id"), nullable=True),
+            sa.Column("positivity_score", sa.String(), nullable=True),
+            sa.Column("is_deleted", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.CheckConstraint("length(body) <= 140", name="body_length_check"),
+        )
+        op.create_index("ix_posts_author_id", "posts", ["author_id"])
+        op.create_index("ix_posts_created_at", "posts", ["created_at"])
+        op.create_index("ix_posts_author_created", "posts", ["author_id", "created_at"])
+
+    if "likes" not in existing:
+        op.create_table(
+            "likes",
+            sa.Column("post_id", UUID(), sa.ForeignKey("posts.id"), primary_key=True),
+            sa.Column("user_id", UUID(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_likes_post_id", "likes", ["post_id"])
+        op.create_index("ix_likes_user_id", "likes", ["user_id"])
+
+    if "moderation_reports" not in existing:
+        op.create_table(
+            "moderation_reports",
+            sa.Column("id", UUID(), primary_key=True),
+            sa.Column("post_id", UUID(), sa.ForeignKey("posts.id"), nullable=False),
+            sa.Column("reporter_id", UUID(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("reason", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("status", sa.String(), nullable=True),
+        )
+        op.create_index("ix_moderation_reports_post_id", "moderation_reports", ["post_id"])
+        op.create_index("ix_moderation_reports_reporter_id", "moderation_reports", ["reporter_id"])
+
+    if "email_verification_tokens" not in existing:
+        op.create_table(
+            "email_verification_tokens",
+            sa.Column("token", UUID(), primary_key=True),
+            sa.Column("user_id", UUID(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    for table in ("email_verification_tokens", "moderation_reports", "likes", "posts", "sessions", "users"):
+        op.drop_table(table)
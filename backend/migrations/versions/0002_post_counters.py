@@ -0,0 +1,53 @@
+"""denormalized post counters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:10:00
+
+Adds posts.like_count and posts.reply_count (skipped when an earlier
+create_all already added them) and backfills them from likes/posts.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+posts = sa.table(
+    "posts",
+    sa.column("id"),
+    sa.column("parent_id"),
+    sa.column("is_deleted", sa.Boolean()),
+    sa.column("like_count", sa.Integer()),
+    sa.column("reply_count", sa.Integer()),
+)
+likes = sa.table("likes", sa.column("post_id"))
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("posts")}
+    for name in ("like_count", "reply_count"):
+        if name not in existing:
+            op.add_column("posts", sa.Column(name, sa.Integer(), nullable=False, server_default="0"))
+
+    replies = posts.alias("replies")
+    op.execute(
+        posts.update().values(
+            like_count=sa.select(sa.func.count()).select_from(likes)
+                .where(likes.c.post_id == posts.c.id).scalar_subquery(),
+            reply_count=sa.select(sa.func.count()).select_from(replies)
+                .where(sa.and_(replies.c.parent_id == posts.c.id, replies.c.is_deleted == sa.false()))
+                .scalar_subquery(),
+        )
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("posts") as batch_op:
+        batch_op.drop_column("reply_count")
+        batch_op.drop_column("like_count")
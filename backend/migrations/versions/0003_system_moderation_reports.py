@@ -0,0 +1,30 @@
+"""allow moderation reports without a reporter
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 09:20:00
+
+Reports filed automatically by the moderation pipeline have no reporter.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from models import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("moderation_reports") as batch_op:
+        batch_op.alter_column("reporter_id", existing_type=UUID(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM moderation_reports WHERE reporter_id IS NULL")
+    with op.batch_alter_table("moderation_reports") as batch_op:
+        batch_op.alter_column("reporter_id", existing_type=UUID(), nullable=False)
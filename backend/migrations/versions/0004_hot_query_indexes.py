@@ -0,0 +1,44 @@
+"""indexes for the feed and replies
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 09:30:00
+
+Partial indexes only cover the rows the hot queries can return:
+- feed:    parent_id IS NULL AND is_deleted = false ORDER BY created_at DESC, id DESC
+- replies: parent_id = ? AND is_deleted = false ORDER BY created_at, id
+
+The session lookup (token_hash = ? AND expires_at > ? AND revoked = false)
+is already an equality probe on the unique token_hash index, so it gets no
+extra index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_feed", "posts",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("parent_id IS NULL AND is_deleted = false"),
+        sqlite_where=sa.text("parent_id IS NULL AND is_deleted = 0"),
+    )
+    op.create_index(
+        "ix_posts_replies", "posts",
+        ["parent_id", "created_at", "id"],
+        postgresql_where=sa.text("parent_id IS NOT NULL AND is_deleted = false"),
+        sqlite_where=sa.text("parent_id IS NOT NULL AND is_deleted = 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_replies", table_name="posts")
+    op.drop_index("ix_posts_feed", table_name="posts")
@@ -0,0 +1,37 @@
+"""pad second-resolution SQLite timestamps
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 11:40:00
+
+Rows created through SQLite's CURRENT_TIMESTAMP default are stored as
+'YYYY-MM-DD HH:MM:SS', while SQLAlchemy binds datetimes with microseconds,
+so keyset comparisons against those rows went wrong. New rows get a
+Python-side default; this pads the existing ones. Postgres is unaffected.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("posts", "users")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table in TABLES:
+        op.execute(
+            f"UPDATE {table} SET created_at = created_at || '.000000' "
+            "WHERE length(created_at) = 19"
+        )
+
+
+def downgrade() -> None:
+    # Padded values are still valid timestamps
+    pass
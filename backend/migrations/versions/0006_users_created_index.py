@@ -0,0 +1,25 @@
+"""index for paging users by creation time
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 12:10:00
+
+/admin/users pages with a keyset on (created_at, id).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_created", "users", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_created", table_name="users")
@@ -0,0 +1,69 @@
+"""store session tokens as SHA-256 digests
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 15:40:00
+
+sessions.token_hash held the cookie value itself. It now holds the 32-byte
+SHA-256 digest of it, which is also a smaller index key than the 36
+character text. Existing rows are hashed in place, so nobody is logged out.
+Downgrading cannot recover the tokens and deletes all sessions.
+"""
+from typing import Sequence, Union
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from models import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+sessions = sa.table(
+    "sessions",
+    sa.column("id", UUID()),
+    sa.column("token_hash", sa.Text()),
+    sa.column("token_digest", sa.LargeBinary()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("sessions") as batch_op:
+        batch_op.add_column(sa.Column("token_digest", sa.LargeBinary(32), nullable=True))
+
+    # Hash the existing tokens in primary key order, a batch at a time
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        stmt = sa.select(sessions.c.id, sessions.c.token_hash).order_by(sessions.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            stmt = stmt.where(sessions.c.id > last_id)
+        rows = connection.execute(stmt).all()
+        if not rows:
+            break
+        connection.execute(
+            sessions.update().where(sessions.c.id == sa.bindparam("b_id"))
+            .values(token_digest=sa.bindparam("b_digest")),
+            [{"b_id": row.id, "b_digest": hashlib.sha256(row.token_hash.encode("utf-8")).digest()} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("sessions") as batch_op:
+        batch_op.drop_column("token_hash")
+        batch_op.alter_column("token_digest", new_column_name="token_hash", nullable=False)
+    with op.batch_alter_table("sessions") as batch_op:
+        batch_op.create_unique_constraint("sessions_token_hash_key", ["token_hash"])
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM sessions")
+    with op.batch_alter_table("sessions") as batch_op:
+        batch_op.drop_constraint("sessions_token_hash_key", type_="unique")
+        batch_op.alter_column("token_hash", existing_type=sa.LargeBinary(32), type_=sa.Text())
+        batch_op.create_unique_constraint("sessions_token_hash_key", ["token_hash"])
@@ -0,0 +1,32 @@
+"""index for posts still waiting for a positivity score
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 09:00:00
+
+The moderation pipeline sweeps live posts with no positivity_score on
+startup. Scored rows drop out of the partial index, so it stays about as
+small as the backlog and the sweep does not scan the posts table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_unscored", "posts", ["id"],
+        postgresql_where=sa.text("positivity_score IS NULL AND is_deleted = false"),
+        sqlite_where=sa.text("positivity_score IS NULL AND is_deleted = 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_unscored", table_name="posts")
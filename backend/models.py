@@ -1,19 +1,31 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, CheckConstraint, Index
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, LargeBinary, ForeignKey, CheckConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.types import TypeDecorator, CHAR
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from datetime import datetime, timezone
 import uuid
 import os
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    """Python-side creation time, stored with microseconds so keyset cursors
+    compare correctly (SQLite's CURRENT_TIMESTAMP only has whole seconds)"""
+    return datetime.now(timezone.utc)
+
 # Custom UUID type that works with both SQLite and PostgreSQL
 class UUID(TypeDecorator):
+    """On SQLite ids are stored as 36 character text, or as 16 byte blobs
+    with SQLITE_BINARY_UUIDS=1 (convert an existing database first with
+    convert_uuids.py). The declared column type stays CHAR(36) either way;
+    SQLite keeps blobs as they are in a text column."""
     impl = CHAR
     cache_ok = True
 
+    binary_sqlite = os.getenv("SQLITE_BINARY_UUIDS", "").lower() in ("1", "true", "yes", "on")
+
     def load_dialect_impl(self, dialect):
         if dialect.name == 'postgresql':
             return dialect.type_descriptor(PG_UUID())
@@ -25,19 +37,19 @@ class UUID(TypeDecorator):
             return value
         elif dialect.name == 'postgresql':
             return str(value)
+        elif UUID.binary_sqlite:
+            return (value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))).bytes
         else:
-            if not isinstance(value, uuid.UUID):
-                return str(value)
-            else:
-                return str(value)
+            return str(value)
 
     def process_result_value(self, value, dialect):
         if value is None:
             return value
-        else:
-            if not isinstance(value, uuid.UUID):
-                return uuid.UUID(value)
-            return value
+        elif isinstance(value, bytes):
+            return uuid.UUID(bytes=value)
+        elif not isinstance(value, uuid.UUID):
+            return uuid.UUID(value)
+        return value
 
 class User(Base):
     __tablename__ = "users"
@@ -48,9 +60,13 @@ class User(Base):
     password_hash = Column(Text, nullable=False)
     display_name = Column(String(40), nullable=False)
     handle = Column(String(30), unique=True, nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        Index('ix_users_created', 'created_at', 'id'),
+    )
+    
     # Relationships
     posts = relationship("Post", back_populates="author", foreign_keys="Post.author_id")
     sessions = relationship("Session", back_populates="user")
@@ -61,7 +77,8 @@ class Session(Base):
     
     id = Column(UUID(), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(), ForeignKey("users.id"), nullable=False, index=True)
-    token_hash = Column(Text, unique=True, nullable=False)
+    # SHA-256 of the cookie value (auth.hash_token), never the token itself
+    token_hash = Column(LargeBinary(32), unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime(timezone=True), nullable=False)
     revoked = Column(Boolean, default=False)
@@ -78,7 +95,9 @@ class Post(Base):
     parent_id = Column(UUID(), ForeignKey("posts.id"), nullable=True)
     positivity_score = Column(String, nullable=True)  # For future ML
     is_deleted = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")  # Non-deleted replies only
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), index=True)
     
     __table_args__ = (
         CheckConstraint('length(body) <= 140', name='body_length_check'),
@@ -90,6 +109,24 @@ class Post(Base):
     likes = relationship("Like", back_populates="post")
     replies = relationship("Post", remote_side=[id])
 
+# Partial indexes matching the feed and replies queries (see migration 0004)
+Index(
+    'ix_posts_feed', Post.created_at.desc(), Post.id.desc(),
+    postgresql_where=text("parent_id IS NULL AND is_deleted = false"),
+    sqlite_where=text("parent_id IS NULL AND is_deleted = 0")
+)
+Index(
+    'ix_posts_replies', Post.parent_id, Post.created_at, Post.id,
+    postgresql_where=text("parent_id IS NOT NULL AND is_deleted = false"),
+    sqlite_where=text("parent_id IS NOT NULL AND is_deleted = 0")
+)
+# Posts the moderation sweep still has to score (see migration 0009)
+Index(
+    'ix_posts_unscored', Post.id,
+    postgresql_where=text("positivity_score IS NULL AND is_deleted = false"),
+    sqlite_where=text("positivity_score IS NULL AND is_deleted = 0")
+)
+
 class Like(Base):
     __tablename__ = "likes"
     
@@ -106,11 +143,19 @@ class ModerationReport(Base):
     
     id = Column(UUID(), primary_key=True, default=uuid.uuid4)
     post_id = Column(UUID(), ForeignKey("posts.id"), nullable=False, index=True)
-    reporter_id = Column(UUID(), ForeignKey("users.id"), nullable=False, index=True)
+    reporter_id = Column(UUID(), ForeignKey("users.id"), nullable=True, index=True)  # NULL for automatic reports
     reason = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String, default="open")  # open, dismissed, actioned
 
+class RevokedToken(Base):
+    """Logged-out signed session tokens (SESSION_MODE=signed), kept until they expire"""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
 class EmailVerificationToken(Base):
     __tablename__ = "email_verification_tokens"
     
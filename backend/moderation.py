@@ -0,0 +1,203 @@
+from sqlalchemy import select, update, and_
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import asyncio
+import uuid
+import time
+import os
+
+from database import async_session
+from models import Post, ModerationReport, utcnow
+from positivity import tone_score, get_classifier
+
+# A scorer takes a batch of post bodies and returns one positivity score per
+# body, between 0.0 (negative) and 1.0 (positive)
+Scorer = Callable[[List[str]], List[float]]
+
+def rules_scorer(bodies: List[str]) -> List[float]:
+    """Score by tone words. Every accepted post passed check_positivity, so that
+    alone would give them all 1.0"""
+    return [tone_score(body) for body in bodies]
+
+SCORERS: Dict[str, Callable[[], Scorer]] = {
+    "rules": lambda: rules_scorer,
+    "classifier": lambda: lambda bodies: get_classifier().score(bodies),
+}
+
+def register_scorer(name: str, factory: Callable[[], Scorer]):
+    """Make a scorer selectable through MODERATION_SCORER"""
+    SCORERS[name] = factory
+
+class ModerationPipeline:
+    """Scores accepted posts in batches on a background task.
+
+    create_post only enqueues; the worker collects up to batch_size posts
+    (waiting at most batch_wait seconds for a batch to fill), scores them in a
+    thread, writes positivity_score and files a ModerationReport for every
+    post scoring below report_threshold.
+
+    Posts still queued at shutdown or dropped from a full queue keep a NULL
+    score; start() sweeps those up in the background.
+    """
+
+    def __init__(self, scorer_name: str = "rules", batch_size: int = 64, batch_wait: float = 0.5,
+                 queue_size: int = 10000, report_threshold: Optional[float] = None):
+        self.scorer_name = scorer_name
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.report_threshold = report_threshold
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.scorer: Optional[Scorer] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.scored = 0
+        self.swept = 0
+        self.batches = 0
+        self.reports_filed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_batch_ms = 0.0
+
+    def submit(self, post_id: uuid.UUID, body: str) -> bool:
+        """Queue a post for scoring without waiting; drops it if the queue is full"""
+        try:
+            self.queue.put_nowait((post_id, body))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    def start(self):
+        if self._task is None:
+            self.scorer = SCORERS[self.scorer_name]()
+            self._task = asyncio.create_task(self._run())
+            # Posts created from now on go through the queue
+            self._sweep_task = asyncio.create_task(self._sweep(utcnow()))
+
+    async def stop(self):
+        for task in (self._sweep_task, self._task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._sweep_task = None
+
+    async def _sweep(self, before: datetime):
+        try:
+            await self.sweep(before)
+        except Exception as e:
+            self.errors += 1
+            print(f"Moderation sweep failed: {type(e).__name__}: {str(e)}")
+
+    async def sweep(self, before: datetime) -> int:
+        """Score the live posts created before `before` that have no score, returns how many"""
+        swept = 0
+        last_id = None
+        while True:
+            stmt = select(Post.id, Post.body).where(and_(
+                Post.positivity_score.is_(None),
+                Post.is_deleted == False,
+                Post.created_at < before
+            )).order_by(Post.id).limit(self.batch_size)
+            # Keyset on id, so a post the scorer cannot write is not read again
+            if last_id is not None:
+                stmt = stmt.where(Post.id > last_id)
+            async with async_session() as db:
+                rows = (await db.execute(stmt)).all()
+            if not rows:
+                return swept
+            await self.process([(row.id, row.body) for row in rows])
+            swept += len(rows)
+            self.swept += len(rows)
+            last_id = rows[-1].id
+
+    async def _next_batch(self) -> list:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self.process(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"Moderation batch failed: {type(e).__name__}: {str(e)}")
+
+    async def process(self, batch: list):
+        start = time.perf_counter()
+        post_ids = [post_id for post_id, _ in batch]
+        bodies = [body for _, body in batch]
+
+        # Scoring can be CPU heavy, keep it off the event loop
+        scores = await asyncio.get_running_loop().run_in_executor(None, self.scorer, bodies)
+
+        async with async_session() as db:
+            await db.execute(
+                update(Post),
+                [
+                    {"id": post_id, "positivity_score": f"{score:.4f}"}
+                    for post_id, score in zip(post_ids, scores)
+                ]
+            )
+            await db.commit()
+
+        self.scored += len(batch)
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        if self.report_threshold is not None:
+            flagged = [
+                (post_id, score) for post_id, score in zip(post_ids, scores)
+                if score < self.report_threshold
+            ]
+            if flagged:
+                async with async_session() as db:
+                    db.add_all([
+                        ModerationReport(
+                            post_id=post_id,
+                            reporter_id=None,
+                            reason=f"Automatic: positivity score {score:.2f} below {self.report_threshold:.2f}",
+                            status="open"
+                        )
+                        for post_id, score in flagged
+                    ])
+                    await db.commit()
+                self.reports_filed += len(flagged)
+
+    def stats(self) -> dict:
+        return {
+            "scorer": self.scorer_name,
+            "queued": self.queue.qsize(),
+            "scored": self.scored,
+            "swept": self.swept,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "reports_filed": self.reports_filed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+def _env_threshold() -> Optional[float]:
+    value = os.getenv("MODERATION_REPORT_THRESHOLD")
+    return float(value) if value else None
+
+moderation_pipeline = ModerationPipeline(
+    scorer_name=os.getenv("MODERATION_SCORER", "rules"),
+    batch_size=int(os.getenv("MODERATION_BATCH_SIZE", "64")),
+    batch_wait=float(os.getenv("MODERATION_BATCH_WAIT", "0.5")),
+    queue_size=int(os.getenv("MODERATION_QUEUE_SIZE", "10000")),
+    report_threshold=_env_threshold()
+)
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import bcrypt
+import os
+
+# bcrypt releases the GIL while it works, so a small thread pool keeps the
+# event loop free without the pickling overhead of a process pool
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+_completed = 0
+_rejected = 0
+
+class PasswordPoolSaturated(Exception):
+    """Raised when too many hashing jobs are already queued"""
+
+async def _submit(fn, *args):
+    global _pending, _completed, _rejected
+    if _pending >= BCRYPT_MAX_PENDING:
+        _rejected += 1
+        raise PasswordPoolSaturated()
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+        _completed += 1
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def _verify(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+async def hash_password(password: str) -> str:
+    return await _submit(_hash, password)
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await _submit(_verify, password, password_hash)
+
+def needs_rehash(password_hash: str) -> bool:
+    """True when a hash was made with a lower cost factor than BCRYPT_ROUNDS"""
+    try:
+        rounds = int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds < BCRYPT_ROUNDS
+
+def pool_stats() -> dict:
+    return {
+        "workers": BCRYPT_WORKERS,
+        "rounds": BCRYPT_ROUNDS,
+        "max_pending": BCRYPT_MAX_PENDING,
+        "pending": _pending,
+        "completed": _completed,
+        "rejected": _rejected,
+    }
@@ -0,0 +1,140 @@
+from typing import Iterable, Optional
+import re
+import os
+
+# Simple profanity filter. Matching is by whole word; a trailing '*' makes an
+# entry a stem that also matches every word starting with it
+NEGATIVE_WORDS = [
+    "hate*", "hating", "stupid*", "idiot*", "awful*", "terribl*", "horribl*",
+    "suck*", "worst*", "loser*", "pathetic*",
+    # Listed out, since 'fail*' would also catch 'failsafe'
+    "fail", "fails", "failed", "failing", "failure", "failures"
+]
+
+# Excessive negativity patterns, compiled once into a single alternation
+NEGATIVE_PATTERN = re.compile(
+    r"\b(?:not|never|can't|won't|don't|couldn't|shouldn't)\b.*\b(?:good|great|amazing|awesome)\b"
+    r"|\b(?:everything|nothing)\b.*\b(?:wrong|bad|terrible)\b"
+)
+
+# The patterns above can only match when one of these words is present
+NEGATIVE_PATTERN_TRIGGERS = frozenset([
+    "not", "never", "can't", "won't", "don't", "couldn't", "shouldn't", "everything", "nothing"
+])
+
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+class Lexicon:
+    """Word list compiled for whole-word matching in one pass over the text"""
+
+    def __init__(self, words: Iterable[str]):
+        entries = {word.strip().lower() for word in words if word.strip()}
+        stems = {entry for entry in entries if entry.endswith("*") and len(entry) > 1}
+
+        # Single words are matched by set lookup of the text's tokens, so the
+        # cost does not grow with the size of the list
+        self.words = frozenset(entry for entry in entries if WORD_PATTERN.fullmatch(entry))
+
+        # Stems and multi-word phrases (rare) fall back to one alternation regex
+        phrases = sorted(entries - self.words - stems, key=len, reverse=True)
+        alternatives = [r"\b" + re.escape(stem[:-1]) + r"\w*" for stem in sorted(stems, key=len, reverse=True)]
+        alternatives += [r"\b" + re.escape(phrase) + r"\b" for phrase in phrases]
+        self.phrase_pattern = re.compile("|".join(alternatives)) if alternatives else None
+        self.size = len(entries)
+
+    def __len__(self):
+        return self.size
+
+    def matches(self, text_lower: str, tokens: list) -> bool:
+        if not self.words.isdisjoint(tokens):
+            return True
+        return bool(self.phrase_pattern and self.phrase_pattern.search(text_lower))
+
+def load_words(path: str) -> list:
+    """Read a lexicon file: one word, stem* or phrase per line, '#' starts a comment"""
+    words = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = line.split("#", 1)[0].strip()
+            if entry:
+                words.append(entry)
+    return words
+
+_lexicon = Lexicon(NEGATIVE_WORDS)
+
+def reload_lexicon(words: Optional[Iterable[str]] = None) -> int:
+    """Swap in a new word list without a restart, returns its size.
+
+    Without explicit words the list is read from POSITIVITY_LEXICON_PATH,
+    falling back to the built-in NEGATIVE_WORDS.
+    """
+    global _lexicon
+    if words is None:
+        path = os.getenv("POSITIVITY_LEXICON_PATH")
+        words = load_words(path) if path else NEGATIVE_WORDS
+    lexicon = Lexicon(words)
+    _lexicon = lexicon
+    return len(lexicon)
+
+# Optional engine: "classifier" scores posts with the hashed n-gram model from
+# classifier.py instead of the word list
+POSITIVITY_ENGINE = os.getenv("POSITIVITY_ENGINE", "rules")
+POSITIVITY_THRESHOLD = float(os.getenv("POSITIVITY_THRESHOLD", "0.5"))
+
+_classifier = None
+
+def load_classifier(path: Optional[str] = None):
+    """(Re)load the classifier model from POSITIVITY_MODEL_PATH"""
+    global _classifier
+    from classifier import PositivityClassifier
+    _classifier = PositivityClassifier.load(path or os.getenv("POSITIVITY_MODEL_PATH", "positivity_model.npz"))
+    return _classifier
+
+def get_classifier():
+    return _classifier if _classifier is not None else load_classifier()
+
+def check_positivity(text: str) -> bool:
+    """Basic rule-based positivity check"""
+    if POSITIVITY_ENGINE == "classifier":
+        return get_classifier().score([text])[0] >= POSITIVITY_THRESHOLD
+
+    text_lower = text.lower()
+    tokens = WORD_PATTERN.findall(text_lower)
+
+    # Check for negative words
+    if _lexicon.matches(text_lower, tokens):
+        return False
+
+    # Check for excessive negativity patterns
+    if not NEGATIVE_PATTERN_TRIGGERS.isdisjoint(tokens) and NEGATIVE_PATTERN.search(text_lower):
+        return False
+
+    return True
+
+# Tone words for grading posts that passed the check: mildly negative words
+# are allowed in a post but pull its score down
+TONE_POSITIVE_WORDS = frozenset([
+    "grateful", "thankful", "thanks", "happy", "joy", "love", "loved", "lovely", "glad",
+    "good", "great", "amazing", "awesome", "wonderful", "beautiful", "kind", "proud",
+    "excited", "calm", "peaceful", "blessed", "smile", "fun", "nice", "enjoy", "enjoyed",
+    "hope", "hopeful", "delighted", "fantastic"
+])
+TONE_NEGATIVE_WORDS = frozenset([
+    "sad", "tired", "angry", "annoyed", "upset", "bad", "worried", "anxious", "stressed",
+    "lonely", "bored", "hurt", "sick", "cry", "crying", "miss", "frustrated", "disappointed",
+    "ugly", "boring", "mad", "exhausted", "afraid", "scared", "pain", "annoying", "gloomy",
+    "rough", "meh", "ugh"
+])
+
+def tone_score(text: str) -> float:
+    """0.0 if the check rejects the text, otherwise the smoothed share of
+    positive among its tone words (0.5 when it has none)"""
+    if not check_positivity(text):
+        return 0.0
+    tokens = WORD_PATTERN.findall(text.lower())
+    positive = sum(token in TONE_POSITIVE_WORDS for token in tokens)
+    negative = sum(token in TONE_NEGATIVE_WORDS for token in tokens)
+    return (positive + 1) / (positive + negative + 2)
+
+if os.getenv("POSITIVITY_LEXICON_PATH"):
+    reload_lexicon()
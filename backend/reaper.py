@@ -0,0 +1,131 @@
+"""Background deletion of dead auth rows.
+
+Logout only marks a session revoked and nothing ever removed expired
+sessions or verification tokens, so the tables (and the unique index every
+request probes) kept growing. The reaper wakes up every REAPER_INTERVAL
+seconds and deletes such rows in batches of REAPER_BATCH_SIZE, pausing
+REAPER_BATCH_PAUSE seconds between batches and stopping after
+REAPER_MAX_BATCHES per table, so a large backlog is worked off over several
+cycles instead of in one long burst of writes.
+
+    python reaper.py    # one full pass, then exit
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import os
+import time
+
+from sqlalchemy import select, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session
+from models import Session, EmailVerificationToken, RevokedToken
+
+# Table name, primary key column, and the condition (given the current time)
+# for rows that can go
+Target = Tuple[str, object, Callable[[datetime], object]]
+
+TARGETS: List[Target] = [
+    ("sessions", Session.id, lambda now: or_(Session.expires_at <= now, Session.revoked == True)),
+    ("email_verification_tokens", EmailVerificationToken.token, lambda now: EmailVerificationToken.expires_at <= now),
+    ("revoked_tokens", RevokedToken.jti, lambda now: RevokedToken.expires_at <= now),
+]
+
+async def delete_batch(db: AsyncSession, key_column, condition, batch_size: int) -> int:
+    """Delete up to batch_size rows matching condition, returns how many went"""
+    doomed = select(key_column).where(condition).limit(batch_size).scalar_subquery()
+    result = await db.execute(
+        delete(key_column.class_).where(key_column.in_(doomed)).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+class Reaper:
+    def __init__(self, interval: float = 300, batch_size: int = 500, batch_pause: float = 0.1,
+                 max_batches: int = 100):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.max_batches = max_batches
+        self._task: Optional[asyncio.Task] = None
+        self.reclaimed: Dict[str, int] = {name: 0 for name, _, _ in TARGETS}
+        self.last_cycle: Dict[str, int] = {}
+        self.cycles = 0
+        self.errors = 0
+        self.last_cycle_ms = 0.0
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"Reaper cycle failed: {type(e).__name__}: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict[str, int]:
+        """One pass over every table, returns the rows deleted from each"""
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        cycle = {}
+        for name, key_column, condition in TARGETS:
+            deleted = 0
+            for _ in range(self.max_batches):
+                async with async_session() as db:
+                    count = await delete_batch(db, key_column, condition(now), self.batch_size)
+                deleted += count
+                self.reclaimed[name] += count
+                if count < self.batch_size:
+                    break
+                await asyncio.sleep(self.batch_pause)
+            cycle[name] = deleted
+
+        self.last_cycle = cycle
+        self.cycles += 1
+        self.last_cycle_ms = round((time.perf_counter() - start) * 1000, 3)
+        return cycle
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "cycles": self.cycles,
+            "reclaimed": dict(self.reclaimed),
+            "last_cycle": self.last_cycle,
+            "last_cycle_ms": self.last_cycle_ms,
+            "errors": self.errors,
+        }
+
+# REAPER_INTERVAL=0 turns the background task off
+reaper = Reaper(
+    interval=float(os.getenv("REAPER_INTERVAL", "300")),
+    batch_size=int(os.getenv("REAPER_BATCH_SIZE", "500")),
+    batch_pause=float(os.getenv("REAPER_BATCH_PAUSE", "0.1")),
+    max_batches=int(os.getenv("REAPER_MAX_BATCHES", "100"))
+)
+
+async def main():
+    from database import init_db
+
+    await init_db()
+    # Unbounded, a manual pass should finish the job
+    reaper.max_batches = 1 << 30
+    cycle = await reaper.run_once()
+    for name, deleted in cycle.items():
+        print(f"{name}: {deleted} row(s) deleted")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -68,10 +68,17 @@ class PostList(BaseModel):
 class PostDetail(BaseModel):
     post: PostResponse
     replies: List[PostResponse]
+    next_cursor: Optional[str] = None
 
 class LikeResponse(BaseModel):
     liked: bool
     like_count: int
 
+class LikeLookupRequest(BaseModel):
+    post_ids: List[uuid.UUID] = Field(..., max_length=500)
+
+class LikeLookupResponse(BaseModel):
+    liked: List[uuid.UUID]
+
 class MessageResponse(BaseModel):
     message: str
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Stateless HMAC-signed session tokens (SESSION_MODE=signed).
+
+The token carries the user's id, display fields and expiry, signed with
+SESSION_SECRET, so authenticating a request is an HMAC check with no
+database lookup:
+
+    v1.<base64url JSON claims>.<base64url HMAC-SHA256>
+
+Display fields are fixed when the token is issued, until the next login.
+Logging out adds the token id (jti) to a revocation list in memory and to
+the revoked_tokens table. Every worker reloads recent revocations every
+SESSION_DENYLIST_SYNC seconds, so a token logged out on another worker
+still works for at most that long. Entries are dropped once their token
+has expired anyway.
+
+Switching SESSION_MODE, or changing the secret, signs everyone out.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import uuid
+import warnings
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from auth import UserSnapshot
+from database import async_session, dialect_insert
+from models import RevokedToken
+
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+SESSION_DENYLIST_SYNC = float(os.getenv("SESSION_DENYLIST_SYNC", "30"))
+
+SIGNED_SESSIONS = os.getenv("SESSION_MODE", "db").lower() == "signed"
+if SIGNED_SESSIONS and not SESSION_SECRET:
+    warnings.warn("SESSION_MODE=signed needs SESSION_SECRET, using database sessions")
+    SIGNED_SESSIONS = False
+
+TOKEN_VERSION = "v1"
+
+# Revocations are re-read with this much overlap, so one committed late by
+# another worker is not skipped
+SYNC_OVERLAP = timedelta(seconds=60)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+class SignedSessions:
+    def __init__(self, secret: str, sync_interval: float = 30):
+        self.key = secret.encode("utf-8")
+        self.sync_interval = sync_interval
+        # jti -> expiry (epoch seconds) of revoked, not yet expired tokens
+        self.denylist: Dict[str, float] = {}
+        self._synced_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+        self.syncs = 0
+        self.errors = 0
+
+    def _sign(self, message: str) -> str:
+        return _b64encode(hmac.new(self.key, message.encode("utf-8"), hashlib.sha256).digest())
+
+    def issue(self, user: UserSnapshot, max_age: int) -> str:
+        """A token for the user, valid for max_age seconds"""
+        claims = {
+            "sub": str(user.id),
+            "em": user.email,
+            "dn": user.display_name,
+            "h": user.handle,
+            "ca": user.created_at.isoformat() if user.created_at else None,
+            "exp": int(time.time()) + max_age,
+            "jti": secrets.token_hex(16),
+        }
+        message = f"{TOKEN_VERSION}.{_b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))}"
+        self.issued += 1
+        return f"{message}.{self._sign(message)}"
+
+    def claims(self, token: str) -> Optional[dict]:
+        """The token's claims if it is authentic, unexpired and not revoked"""
+        message, _, signature = token.rpartition(".")
+        if not message.startswith(TOKEN_VERSION + ".") or not hmac.compare_digest(
+            self._sign(message).encode("utf-8"), signature.encode("utf-8")
+        ):
+            self.rejected += 1
+            return None
+
+        claims = json.loads(_b64decode(message[len(TOKEN_VERSION) + 1:]))
+        if claims["exp"] <= time.time() or claims["jti"] in self.denylist:
+            self.rejected += 1
+            return None
+        self.verified += 1
+        return claims
+
+    def verify(self, token: str) -> Optional[UserSnapshot]:
+        claims = self.claims(token)
+        if claims is None:
+            return None
+        return UserSnapshot(
+            id=uuid.UUID(claims["sub"]),
+            email=claims["em"],
+            display_name=claims["dn"],
+            handle=claims["h"],
+            created_at=datetime.fromisoformat(claims["ca"]) if claims["ca"] else None
+        )
+
+    async def revoke(self, db: AsyncSession, token: str):
+        """Log a token out here now, and on other workers after their next sync"""
+        claims = self.claims(token)
+        if claims is None:
+            return
+        self.denylist[claims["jti"]] = claims["exp"]
+        # Already there if another worker (or a retry) revoked it first
+        await db.execute(
+            dialect_insert(RevokedToken).values(
+                jti=claims["jti"],
+                expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc)
+            ).on_conflict_do_nothing(index_elements=["jti"])
+        )
+        await db.commit()
+
+    async def sync(self):
+        """Pick up revocations made by other workers and forget expired ones"""
+        now = datetime.now(timezone.utc)
+        stmt = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        if self._synced_at is not None:
+            stmt = stmt.where(RevokedToken.revoked_at > self._synced_at - SYNC_OVERLAP)
+
+        async with async_session() as db:
+            result = await db.execute(stmt)
+            for jti, expires_at in result:
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self.denylist[jti] = expires_at.timestamp()
+
+        cutoff = now.timestamp()
+        self.denylist = {jti: expires for jti, expires in self.denylist.items() if expires > cutoff}
+        self._synced_at = now
+        self.syncs += 1
+
+    async def start(self):
+        if self._task is None:
+            await self.sync()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                self.errors += 1
+                print(f"Revocation sync failed: {type(e).__name__}: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SIGNED_SESSIONS,
+            "issued": self.issued,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "revoked": len(self.denylist),
+            "syncs": self.syncs,
+            "errors": self.errors,
+        }
+
+signed_sessions = SignedSessions(SESSION_SECRET, sync_interval=SESSION_DENYLIST_SYNC)
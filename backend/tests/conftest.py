@@ -0,0 +1,74 @@
+"""Shared fixtures: the app running against a throwaway SQLite database.
+
+    cd backend && python -m pytest tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# The modules read their settings at import time, so these go first
+WORKDIR = tempfile.mkdtemp(prefix="joylet_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+os.environ["LIKE_WAL_DIR"] = os.path.join(WORKDIR, "like_wal")
+os.environ["REAPER_INTERVAL"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main
+from database import engine
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+@pytest.fixture
+def make_user(client):
+    """Registers and logs in a new user, returns the headers that authenticate as them"""
+    def make() -> dict:
+        name = f"tester_{uuid.uuid4().hex[:12]}"
+        credentials = {"email": f"{name}@example.com", "password": "password1"}
+        client.post("/auth/register", json={**credentials, "display_name": name})
+        response = client.post("/auth/login", json=credentials)
+        assert response.status_code == 200
+        # Every request says who it is, nothing rides along in the client's jar
+        client.cookies.clear()
+        return {"Cookie": f"session={response.cookies['session']}"}
+    return make
+
+@pytest.fixture
+def make_post(client):
+    def make(headers: dict, parent_id: str = None) -> str:
+        body = {"body": "Grateful for the sunshine today"}
+        if parent_id:
+            body["parent_id"] = parent_id
+        response = client.post("/posts", json=body, headers=headers)
+        assert response.status_code == 200
+        return response.json()["id"]
+    return make
+
+@pytest.fixture
+def count_queries():
+    """Context manager counting the SQL statements run inside it"""
+    class Counter:
+        def __init__(self):
+            self.count = 0
+
+        def __enter__(self):
+            event.listen(engine.sync_engine, "after_cursor_execute", self._record)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(engine.sync_engine, "after_cursor_execute", self._record)
+
+        def _record(self, *args):
+            self.count += 1
+
+    return Counter
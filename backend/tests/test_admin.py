@@ -0,0 +1,13 @@
+import auth
+
+def test_metrics_need_an_admin(client, make_user, monkeypatch):
+    assert client.get("/admin/metrics").status_code == 401
+
+    headers = make_user()
+    assert client.get("/admin/metrics", headers=headers).status_code == 403
+
+    email = client.get("/users/me", headers=headers).json()["email"]
+    monkeypatch.setattr(auth, "ADMIN_EMAILS", frozenset({email}))
+    response = client.get("/admin/metrics", headers=headers)
+    assert response.status_code == 200
+    assert "db_pool" in response.json()
@@ -0,0 +1,75 @@
+"""fast_json must produce the same bytes FastAPI does for the same response_model"""
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import random
+import uuid
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import fast_json
+from feed import post_response
+from models import Post, User
+from schemas import PostDetail, PostList
+
+pytestmark = pytest.mark.skipif(fast_json.orjson is None, reason="orjson is not installed")
+
+POST_LIST_FIELD = create_response_field(name="response", type_=PostList)
+POST_DETAIL_FIELD = create_response_field(name="response", type_=PostDetail)
+
+def make_posts(count: int, aware: bool):
+    rng = random.Random(7)
+    tz = timezone.utc if aware else None
+    start = datetime(2026, 10, 16, 12, 0, 0, tzinfo=tz)
+    authors = [
+        User(id=uuid.uuid4(), display_name=name, handle=name.lower()[:8] + str(i))
+        for i, name in enumerate(["Ann", "Zoë", "Kenji", "Ola \"O\" Smith"])
+    ]
+    posts = []
+    for i in range(count):
+        author = rng.choice(authors)
+        posts.append(Post(
+            id=uuid.uuid4(), author=author, author_id=author.id,
+            body=rng.choice(["Grateful for sunshine ☀", "Small win today!", "Tea & \"quiet\" mornings", "Danke 💛"]),
+            parent_id=None, is_deleted=False,
+            like_count=rng.randint(0, 500), reply_count=rng.randint(0, 40),
+            created_at=start - timedelta(seconds=i * 7, microseconds=rng.choice([0, 120000, 7])),
+        ))
+    return posts
+
+async def pydantic_bytes(field, content) -> bytes:
+    """What FastAPI sends for a handler returning a model under response_model"""
+    jsonable = await serialize_response(field=field, response_content=content)
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+@pytest.fixture(params=[False, True], ids=["naive", "aware"])
+def posts(request):
+    return make_posts(50, aware=request.param)
+
+def test_feed_page(posts):
+    liked = {post.id for post in posts[::3]}
+    page = PostList(items=[post_response(post, liked) for post in posts], next_cursor="c_1")
+    expected = asyncio.run(pydantic_bytes(POST_LIST_FIELD, page))
+    assert fast_json.post_list_json(posts, liked, "c_1") == expected
+
+@pytest.mark.parametrize("deleted", [False, True])
+def test_post_detail(posts, deleted):
+    liked = {post.id for post in posts[::3]}
+    main_post, replies = posts[0], posts[1:]
+    main_post.is_deleted = deleted
+    for reply in replies:
+        reply.parent_id = main_post.id
+    detail = PostDetail(post=post_response(main_post, liked),
+                        replies=[post_response(reply, liked) for reply in replies], next_cursor=None)
+    expected = asyncio.run(pydantic_bytes(POST_DETAIL_FIELD, detail))
+    assert fast_json.post_detail_json(main_post, replies, liked, None) == expected
+
+def test_plain_dict(posts):
+    users = {"total_users": 1, "users": [{"id": str(uuid.uuid4()), "email": "a@b.co", "display_name": "Zoë",
+                                           "handle": "zoe", "email_verified": True,
+                                           "created_at": posts[0].created_at.isoformat()}]}
+    expected = json.dumps(jsonable_encoder(users), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert fast_json.dumps(users) == expected
@@ -0,0 +1,79 @@
+from sqlalchemy import select, update, func
+
+from database import async_session
+from feed import feed_cache, MAX_FEED_PAGE
+from models import Post
+
+def test_feed_page_query_count_does_not_grow_with_posts(client, make_user, make_post, count_queries):
+    author, viewer = make_user(), make_user()
+    post_id = make_post(author)
+    make_post(author, parent_id=post_id)
+    client.post(f"/posts/{post_id}/like", headers=viewer)
+
+    def feed_queries(headers: dict) -> int:
+        feed_cache.invalidate()
+        # Warm the per-session caches so only the page itself is counted
+        client.get("/posts", headers=headers)
+        feed_cache.invalidate()
+        with count_queries() as counter:
+            response = client.get("/posts?limit=50", headers=headers)
+        assert response.status_code == 200
+        return counter.count
+
+    anonymous_one, viewer_one = feed_queries({}), feed_queries(viewer)
+    for _ in range(30):
+        post_id = make_post(author)
+        make_post(author, parent_id=post_id)
+        client.post(f"/posts/{post_id}/like", headers=viewer)
+    anonymous_many, viewer_many = feed_queries({}), feed_queries(viewer)
+
+    assert len(client.get("/posts?limit=50").json()["items"]) > 30
+    assert anonymous_many == anonymous_one
+    assert viewer_many == viewer_one
+
+def test_cursor_pages_cover_the_feed_once_with_timestamp_ties(client, make_user, make_post):
+    author = make_user()
+    post_ids = [make_post(author) for _ in range(7)]
+
+    async def share_timestamp():
+        # Rows created in the same instant are ordered by id
+        async with async_session() as db:
+            newest = (await db.execute(select(func.max(Post.created_at)))).scalar()
+            await db.execute(update(Post).where(Post.id.in_(post_ids[:4])).values(created_at=newest))
+            await db.commit()
+    client.portal.call(share_timestamp)
+    feed_cache.invalidate()
+
+    everything = [item["id"] for item in client.get("/posts?limit=100").json()["items"]]
+    paged, cursor = [], None
+    while True:
+        page = client.get("/posts", params={"limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+        paged += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert paged == everything
+    assert set(post_ids) <= set(paged)
+
+def test_feed_limit_is_clamped_before_it_reaches_the_cache(client, make_user, make_post):
+    author = make_user()
+    for _ in range(MAX_FEED_PAGE + 5):
+        make_post(author)
+    feed_cache.invalidate()
+
+    assert len(client.get("/posts?limit=-2").json()["items"]) == 1
+    assert len(client.get("/posts?limit=0").json()["items"]) == 1
+    assert len(client.get("/posts?limit=100000").json()["items"]) == MAX_FEED_PAGE
+    assert len(client.get(f"/posts?limit={MAX_FEED_PAGE + 1}", headers=author).json()["items"]) == MAX_FEED_PAGE
+    # Every out-of-range limit shares the entry of the limit it was clamped to
+    assert feed_cache.stats()["size"] == 2
+
+def test_invalid_cursors_share_the_first_page_entry(client, make_user, make_post):
+    make_post(make_user())
+    feed_cache.invalidate()
+
+    first = client.get("/posts").json()
+    for cursor in ("junk", "2026-10-16_not-a-uuid", "a_b_c"):
+        assert client.get(f"/posts?cursor={cursor}").json() == first
+    assert feed_cache.stats()["size"] == 1
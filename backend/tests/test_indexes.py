@@ -0,0 +1,52 @@
+"""The handlers' own statements are planned onto the indexes meant for them.
+
+explain_indexes.py checks the same on Postgres, from hand-written SQL.
+"""
+from datetime import datetime
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from database import engine
+from export import export_stmt
+from feed import feed_page_stmt, replies_page_stmt, encode_cursor
+from models import Post
+
+class Position:
+    created_at = datetime(2026, 10, 16, 12, 0, 0)
+    id = uuid.UUID(int=1)
+
+CURSOR = encode_cursor(Position)
+
+def query_plan(sync_connection, stmt) -> str:
+    """EXPLAIN QUERY PLAN of a statement, with its parameters bound as for a real execution"""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        plans.append("\n".join(row[-1] for row in cursor.fetchall()))
+
+    event.listen(sync_connection, "before_cursor_execute", explain)
+    try:
+        sync_connection.execute(stmt).all()
+    finally:
+        event.remove(sync_connection, "before_cursor_execute", explain)
+    return plans[0]
+
+@pytest.mark.parametrize("stmt, expected", [
+    (feed_page_stmt(None, 20, Post.id), "USING INDEX ix_posts_feed"),
+    (feed_page_stmt(CURSOR, 20, Post.id), "USING INDEX ix_posts_feed ((created_at,id)<(?,?))"),
+    (replies_page_stmt(uuid.uuid4(), None, 20, Post.id), "USING INDEX ix_posts_replies (parent_id=?)"),
+    (replies_page_stmt(uuid.uuid4(), CURSOR, 20, Post.id),
+     "USING INDEX ix_posts_replies (parent_id=? AND (created_at,id)>(?,?))"),
+    (export_stmt(), "USING INDEX ix_posts_created_at"),
+    (export_stmt(after=(Position.created_at, Position.id)), "USING INDEX ix_posts_created_at (created_at>?)"),
+], ids=["feed", "feed cursor page", "replies", "replies cursor page", "export", "export resumed"])
+def test_statement_uses_its_index(client, stmt, expected):
+    async def plan():
+        async with engine.connect() as connection:
+            return await connection.run_sync(query_plan, stmt)
+
+    plan = client.portal.call(plan)
+    assert expected in plan, plan
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+import uuid
+
+import pytest
+
+from like_buffer import like_buffer
+
+def concurrently(calls: int, call):
+    with ThreadPoolExecutor(max_workers=calls) as pool:
+        return list(pool.map(lambda _: call(), range(calls)))
+
+def user_id(client, headers: dict) -> str:
+    return client.get("/users/me", headers=headers).json()["id"]
+
+def like_count(client, post_id: str) -> int:
+    return client.get(f"/posts/{post_id}").json()["post"]["like_count"]
+
+def test_concurrent_unlikes_count_once(client, make_user, make_post):
+    author, fan = make_user(), make_user()
+    post_id = make_post(author)
+    for _ in range(5):
+        assert client.post(f"/posts/{post_id}/like", headers=fan).json()["liked"] is True
+
+        responses = concurrently(4, lambda: client.post(f"/posts/{post_id}/like", headers=fan))
+        # The first toggle unlikes; the rest may see the like and find it gone, or toggle it back
+        assert all(response.status_code == 200 for response in responses)
+        liked = client.post("/likes/lookup", json={"post_ids": [post_id]}, headers=fan).json()["liked"]
+        assert like_count(client, post_id) == len(liked)
+        if liked:
+            client.delete(f"/posts/{post_id}/like", headers=fan)
+        assert like_count(client, post_id) == 0
+
+@pytest.fixture
+def write_behind(client):
+    """Turns the like buffer on for one test, flushing and stopping it afterwards"""
+    like_buffer.enabled = True
+    client.portal.call(like_buffer.start)
+    yield like_buffer
+    client.portal.call(like_buffer.stop)
+    like_buffer.enabled = False
+
+def test_buffered_like_survives_the_flush_in_a_new_liked_filter(client, make_user, make_post, write_behind):
+    author, fan = make_user(), make_user()
+    post_id = make_post(author)
+
+    # Buffered while the fan has no filter yet
+    assert client.put(f"/posts/{post_id}/like", headers=fan).json()["liked"] is True
+    # Builds the fan's filter from the database, which does not have the like yet
+    assert client.get("/posts", headers=fan).json()["items"][0]["user_liked"] is True
+
+    client.portal.call(write_behind.flush)
+    assert write_behind.state(uuid.UUID(user_id(client, fan)), uuid.UUID(post_id)) is None
+
+    assert client.get("/posts", headers=fan).json()["items"][0]["user_liked"] is True
+    assert client.get(f"/posts/{post_id}", headers=fan).json()["post"]["user_liked"] is True
+    assert client.post("/likes/lookup", json={"post_ids": [post_id]}, headers=fan).json()["liked"] == [post_id]
@@ -0,0 +1,33 @@
+from sqlalchemy import select
+
+from database import async_session
+from models import Post, utcnow
+from moderation import moderation_pipeline, rules_scorer
+
+def test_rules_scorer_grades_accepted_posts():
+    glad, neutral, low, rejected = rules_scorer([
+        "Grateful for a lovely walk, so happy",
+        "Went to the market today",
+        "Tired and sad, rough week",
+        "I hate mondays",
+    ])
+    assert glad > neutral > low > rejected == 0.0
+    assert neutral == 0.5
+
+def test_sweep_scores_posts_left_without_a_score(client, make_user, make_post):
+    author = make_user()
+    post_ids = [make_post(author) for _ in range(3)]
+
+    async def unscore_then_sweep():
+        # As if the posts were still queued when the last process stopped
+        async with async_session() as db:
+            for post in (await db.execute(select(Post).where(Post.id.in_(post_ids)))).scalars():
+                post.positivity_score = None
+            await db.commit()
+        await moderation_pipeline.sweep(utcnow())
+        async with async_session() as db:
+            result = await db.execute(select(Post.positivity_score).where(Post.id.in_(post_ids)))
+            return result.scalars().all()
+
+    scores = client.portal.call(unscore_then_sweep)
+    assert len(scores) == 3 and None not in scores
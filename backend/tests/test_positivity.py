@@ -0,0 +1,38 @@
+import pytest
+
+from positivity import check_positivity, reload_lexicon
+
+@pytest.mark.parametrize("text", [
+    "I hate mondays",
+    "what a hateful comment",
+    "hating every minute",
+    "that was idiotic",
+    "terribly sad news",
+    "the stupidest day",
+    "this sucks",
+    "a total failure",
+    "not a good day",
+    "everything went wrong",
+])
+def test_blocked(text):
+    assert not check_positivity(text)
+
+@pytest.mark.parametrize("text", [
+    "Grateful for the sunshine today",
+    "whatever happens, I'm happy",
+    "a failsafe plan for the garden",
+    "bought a new hat",
+    "the honeysuckle is in bloom",
+    "nothing but good news",
+])
+def test_allowed(text):
+    assert check_positivity(text)
+
+def test_reloaded_stems_and_phrases():
+    try:
+        reload_lexicon(["gloom*", "rainy day"])
+        assert not check_positivity("a gloomy morning")
+        assert not check_positivity("another rainy day")
+        assert check_positivity("I hate nothing today")
+    finally:
+        reload_lexicon()
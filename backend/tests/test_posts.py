@@ -0,0 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+
+def test_concurrent_deletes_decrement_reply_count_once(client, make_user, make_post):
+    author = make_user()
+    parent_id = make_post(author)
+    reply_ids = [make_post(author, parent_id=parent_id) for _ in range(3)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda _: client.delete(f"/posts/{reply_ids[0]}", headers=author), range(4)))
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert client.get(f"/posts/{parent_id}").json()["post"]["reply_count"] == 2
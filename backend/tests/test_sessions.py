@@ -0,0 +1,12 @@
+import main
+from signed_sessions import signed_sessions
+
+def test_signed_logout_twice(client, make_user, monkeypatch):
+    monkeypatch.setattr(main, "SIGNED_SESSIONS", True)
+    monkeypatch.setattr(signed_sessions, "key", b"test-secret")
+    headers = make_user()
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    # A worker that has not synced the revocation yet still accepts the token
+    signed_sessions.denylist.clear()
+    assert client.post("/auth/logout", headers=headers).status_code == 200
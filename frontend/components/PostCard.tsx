@@ -1,5 +1,5 @@
 // components/PostCard.tsx
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Post } from '../types';
 import { Heart, MessageCircle, Trash2 } from 'lucide-react';
 import { api } from '../lib/api';
@@ -17,12 +17,17 @@ export default function PostCard({ post, onUpdate, showReplies = false }: PostCa
   const [likesCount, setLikesCount] = useState(post.like_count);
   const [userLiked, setUserLiked] = useState(post.user_liked);
 
+  // Counts can also change under us through live updates
+  useEffect(() => {
+    setLikesCount(post.like_count);
+  }, [post.like_count]);
+
   const handleLike = async (): Promise<void> => {
     if (!user || isLiking) return;
     
     setIsLiking(true);
     try {
-      const result = await api.toggleLike(post.id);
+      const result = await api.setLike(post.id, !userLiked);
       setLikesCount(result.like_count);
       setUserLiked(result.liked);
     } catch (error) {
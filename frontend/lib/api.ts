@@ -60,21 +60,33 @@ export const api = {
   getUser: (userId: string): Promise<PublicUser> => fetchApi(`/users/${userId}`),
 
   // Posts
+  // Fetched without cookies so every visitor gets the shared cached page;
+  // user_liked is filled in afterwards with lookupLikes
   getPosts: (cursor?: string, limit = 20): Promise<PostList> => {
     const params = new URLSearchParams();
     if (cursor) params.append('cursor', cursor);
     params.append('limit', limit.toString());
-    return fetchApi(`/posts?${params}`);
+    return fetchApi(`/posts?${params}`, { credentials: 'omit' });
   },
 
+  // Live feed of new posts; the browser reconnects with Last-Event-ID by itself
+  streamPosts: () => new EventSource(`${API_URL}/posts/stream`),
+
+  // Live like/reply counts for a post and its replies
+  streamPostCounts: (postId: string) => new EventSource(`${API_URL}/posts/${postId}/stream`),
+
   createPost: (data: { body: string; parent_id?: string }) =>
     fetchApi('/posts', {
       method: 'POST',
       body: JSON.stringify(data),
     }),
 
-  getPost: (postId: string): Promise<PostDetail> =>
-    fetchApi(`/posts/${postId}`),
+  getPost: (postId: string, cursor?: string, limit = 50): Promise<PostDetail> => {
+    const params = new URLSearchParams();
+    if (cursor) params.append('cursor', cursor);
+    params.append('limit', limit.toString());
+    return fetchApi(`/posts/${postId}?${params}`);
+  },
 
   deletePost: (postId: string) =>
     fetchApi(`/posts/${postId}`, {
@@ -86,4 +98,17 @@ export const api = {
     fetchApi(`/posts/${postId}/like`, {
       method: 'POST',
     }),
+
+  // Idempotent, so safe to retry
+  setLike: (postId: string, liked: boolean) =>
+    fetchApi(`/posts/${postId}/like`, {
+      method: liked ? 'PUT' : 'DELETE',
+    }),
+
+  // The viewer's likes among posts from a shared (cached) page
+  lookupLikes: (postIds: string[]): Promise<{ liked: string[] }> =>
+    fetchApi('/likes/lookup', {
+      method: 'POST',
+      body: JSON.stringify({ post_ids: postIds }),
+    }),
 };
\ No newline at end of file
@@ -17,8 +17,27 @@ export default function Home() {
   const [error, setError] = useState('');
 
   useEffect(() => {
-    loadPosts();
-  }, []);
+    if (!authLoading) loadPosts();
+  }, [authLoading, user?.id]);
+
+  useEffect(() => {
+    const source = api.streamPosts();
+    source.addEventListener('post', (event) => {
+      const post: Post = JSON.parse((event as MessageEvent).data);
+      setPosts(prev => prev.some(p => p.id === post.id) ? prev : [post, ...prev]);
+    });
+    // Sent when we were away too long to catch up post by post
+    source.addEventListener('reset', () => loadPosts());
+    return () => source.close();
+  }, [user?.id]);
+
+  // The shared page has user_liked false throughout; mark the viewer's likes
+  const withViewerLikes = async (items: Post[]): Promise<Post[]> => {
+    if (!user || items.length === 0) return items;
+    const { liked } = await api.lookupLikes(items.map(post => post.id));
+    const likedIds = new Set(liked);
+    return items.map(post => ({ ...post, user_liked: likedIds.has(post.id) }));
+  };
 
   const loadPosts = async (cursor?: string) => {
     try {
@@ -30,11 +49,12 @@ export default function Home() {
       }
 
       const data = await api.getPosts(cursor);
+      const items = await withViewerLikes(data.items);
       
       if (cursor) {
-        setPosts(prev => [...prev, ...data.items]);
+        setPosts(prev => [...prev, ...items]);
       } else {
-        setPosts(data.items);
+        setPosts(items);
       }
       
       setNextCursor(data.next_cursor);
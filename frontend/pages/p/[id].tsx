@@ -2,7 +2,7 @@
 import { useRouter } from 'next/router';
 import { useState, useEffect } from 'react';
 import { api } from '../../lib/api';
-import { PostDetail } from '../../types';
+import { PostDetail, PostCounts, Post } from '../../types';
 import PostCard from '../../components/PostCard';
 import ReplyForm from '../../components/ReplyForm';
 import { useAuth } from '../../hooks/useAuth';
@@ -15,6 +15,7 @@ export default function PostDetailPage() {
   const { user } = useAuth();
   const [postDetail, setPostDetail] = useState<PostDetail | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
 
   useEffect(() => {
@@ -23,6 +24,25 @@ export default function PostDetailPage() {
     }
   }, [id]);
 
+  useEffect(() => {
+    if (!id || typeof id !== 'string') return;
+
+    const source = api.streamPostCounts(id);
+    source.addEventListener('counts', (event) => {
+      const counts: PostCounts = JSON.parse((event as MessageEvent).data);
+      const apply = (post: Post) =>
+        post.id === counts.id
+          ? { ...post, like_count: counts.like_count, reply_count: counts.reply_count }
+          : post;
+      setPostDetail(prev => prev && {
+        ...prev,
+        post: apply(prev.post),
+        replies: prev.replies.map(apply),
+      });
+    });
+    return () => source.close();
+  }, [id]);
+
   const loadPost = async () => {
     if (!id || typeof id !== 'string') return;
 
@@ -38,6 +58,24 @@ export default function PostDetailPage() {
     }
   };
 
+  const loadMoreReplies = async () => {
+    if (!id || typeof id !== 'string' || !postDetail?.next_cursor) return;
+
+    try {
+      setLoadingMore(true);
+      const data = await api.getPost(id, postDetail.next_cursor);
+      setPostDetail(prev => prev && {
+        post: data.post,
+        replies: [...prev.replies, ...data.replies],
+        next_cursor: data.next_cursor,
+      });
+    } catch (error: any) {
+      setError(error.message || 'Failed to load replies');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="flex justify-center items-center min-h-64">
@@ -93,13 +131,31 @@ export default function PostDetailPage() {
         {postDetail.replies.length > 0 && (
           <div className="space-y-4">
             <h3 className="text-lg font-medium text-gray-900 ml-8">
-              Replies ({postDetail.replies.length})
+              Replies ({postDetail.post.reply_count})
             </h3>
             {postDetail.replies.map((reply) => (
               <div key={reply.id} className="ml-8">
                 <PostCard post={reply} onUpdate={loadPost} />
               </div>
             ))}
+            {postDetail.next_cursor && (
+              <div className="text-center py-4 ml-8">
+                <button
+                  onClick={loadMoreReplies}
+                  disabled={loadingMore}
+                  className="bg-gray-100 text-gray-700 px-6 py-2 rounded-lg hover:bg-gray-200 disabled:opacity-50"
+                >
+                  {loadingMore ? (
+                    <span className="flex items-center space-x-2">
+                      <Loader2 className="h-4 w-4 animate-spin" />
+                      <span>Loading...</span>
+                    </span>
+                  ) : (
+                    'Load More Replies'
+                  )}
+                </button>
+              </div>
+            )}
           </div>
         )}
 
@@ -34,7 +34,14 @@ export interface PostList {
   next_cursor: string | null;
 }
 
+export interface PostCounts {
+  id: string;
+  like_count: number;
+  reply_count: number;
+}
+
 export interface PostDetail {
   post: Post;
   replies: Post[];
+  next_cursor: string | null;
 }
\ No newline at end of file